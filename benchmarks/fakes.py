@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+import numpy as np
+from src.core.backends import DeviceInfo
+from src.core.clip import Clip
+
+
+class FakeClock:
+    def __init__(self, horizon: float | None = None) -> None:
+        self.horizon = horizon
+        self.waits = 0
+        self._now = 0.0
+        self._condition = threading.Condition()
+        self._timers = list()
+        self._counter = itertools.count()
+        self._interrupted = False
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._now
+
+    def call_at(self, when: float, callback) -> None:
+        with self._condition:
+            heapq.heappush(self._timers, (when, next(self._counter), callback))
+
+    def interrupt(self) -> None:
+        # Ends the current (or next) wait early, like an event source waking the real loop
+        self._interrupted = True
+
+    def _take_interrupt(self) -> bool:
+        interrupted, self._interrupted = self._interrupted, False
+        return interrupted
+
+    def _advance_to(self, target: float, event: asyncio.Event | None = None) -> None:
+        while True:
+            with self._condition:
+                if self._timers and self._timers[0][0] <= target:
+                    when, _, callback = heapq.heappop(self._timers)
+                    self._now = max(self._now, when)
+                else:
+                    self._now = max(self._now, target)
+                    self._condition.notify_all()
+                    return
+
+                self._condition.notify_all()
+
+            callback()
+
+            if event is not None and (event.is_set() or self._interrupted):
+                return
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> bool:
+        self.waits += 1
+
+        if event.is_set():
+            return True
+
+        if self._take_interrupt():
+            return False
+
+        target = self._now + (timeout if timeout is not None else float("inf"))
+
+        if self.horizon is not None and target >= self.horizon:
+            self._advance_to(self.horizon, event)
+
+            if event.is_set():
+                return True
+
+            if self._take_interrupt():
+                await asyncio.sleep(0)
+                return event.is_set()
+
+            # Park at the end of the simulation until the harness stops whoever is waiting
+            await event.wait()
+            return True
+
+        self._advance_to(target, event)
+        self._take_interrupt()
+
+        # Let wake-ups posted from other threads while time advanced reach the event
+        await asyncio.sleep(0)
+        return event.is_set()
+
+    def sleep(self, seconds: float) -> None:
+        self._advance_to(self._now + seconds)
+
+    def wait_until(self, when: float) -> None:
+        with self._condition:
+            self._condition.wait_for(lambda: self._now >= when)
+
+
+class FakeStream:
+    def __init__(self, backend: "FakeOutputBackend", device: DeviceInfo | None, samplerate: int, channels: int) -> None:
+        self._backend = backend
+        self.device = device
+        self.samplerate = samplerate
+        self.channels = channels
+        self.active = True
+
+    def write(self, data) -> None:
+        self._backend.record_play(self.device, len(data) / self.samplerate)
+
+    def stop(self) -> None:
+        self.active = False
+
+    def close(self) -> None:
+        self.active = False
+
+
+class FakeOutputBackend:
+    def __init__(self, clock: FakeClock) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.opens = 0
+        self.plays = list()
+        self.listeners = list()
+
+    def open_stream(self, device: DeviceInfo | None, samplerate: int, channels: int) -> FakeStream:
+        with self._lock:
+            self.opens += 1
+
+        return FakeStream(self, device, samplerate, channels)
+
+    def record_play(self, device: DeviceInfo | None, duration: float) -> None:
+        play = (self._clock.monotonic(), None if device is None else device.name, duration)
+
+        with self._lock:
+            self.plays.append(play)
+
+        for listener in self.listeners:
+            listener(*play)
+
+
+class FakeDeviceBackend:
+    def __init__(self, clock: FakeClock, names: list, enumeration_delay: float = 0.0, samplerate: float = 48000.0) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._devices = {name: DeviceInfo(index, name, 0, 2, samplerate) for index, name in enumerate(names)}
+        self._connected = set(names)
+        self.enumeration_delay = enumeration_delay
+        self.enumerations = 0
+        self.enumeration_cpu_seconds = 0.0
+        self.events = list()
+        self.listeners = list()
+        self.rescans = 0
+
+    def _record(self, name: str, kind: str) -> None:
+        self.events.append((self._clock.monotonic(), name, kind))
+
+        for listener in self.listeners:
+            listener(name, kind)
+
+    def connect(self, name: str) -> None:
+        with self._lock:
+            if name in self._connected:
+                return
+
+            self._connected.add(name)
+
+        self._record(name, "connect")
+
+    def disconnect(self, name: str) -> None:
+        with self._lock:
+            if name not in self._connected:
+                return
+
+            self._connected.discard(name)
+
+        self._record(name, "disconnect")
+
+    def is_connected(self, name: str) -> bool:
+        return name in self._connected
+
+    def rescan(self) -> bool:
+        self.rescans += 1
+        return True
+
+    def query_output_devices(self) -> tuple:
+        started = time.process_time()
+
+        with self._lock:
+            devices = tuple(device for name, device in self._devices.items() if name in self._connected)
+            self.enumerations += 1
+
+        self.enumeration_cpu_seconds += time.process_time() - started
+        self._clock.sleep(self.enumeration_delay)
+
+        return devices
+
+
+class FakeDecoder:
+    def __init__(self, clock: FakeClock, decode_delay: float = 0.0, duration: float = 0.5, samplerate: int = 44100) -> None:
+        self._clock = clock
+        self.decode_delay = decode_delay
+        self.duration = duration
+        self.samplerate = samplerate
+        self.decodes = 0
+
+    def decode(self, file_path: str) -> Clip:
+        self.decodes += 1
+        self._clock.sleep(self.decode_delay)
+
+        return Clip(np.zeros((int(self.duration * self.samplerate), 2), dtype=np.float32), self.samplerate)
+
+
+class FakeActivityProbe:
+    def __init__(self, busy_fraction: float = 0.0, seed: int | None = None) -> None:
+        self.busy_fraction = busy_fraction
+        self._rng = random.Random(seed)
+        self.probes = 0
+
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        self.probes += 1
+
+        if self.busy_fraction <= 0:
+            return None
+
+        return self._rng.random() < self.busy_fraction
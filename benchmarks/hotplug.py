@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from loguru import logger
+from src.core.backends import Backends, SystemClock
+from src.core.device_registry import device_registry
+from src.core.engine import engine
+from src.core.hotplug import HotplugWatcher
+from .fakes import FakeDeviceBackend
+
+def wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+
+        time.sleep(0.001)
+
+    return False
+
+def run_hotplug(args: argparse.Namespace) -> dict:
+    names = [f"fake headset {index}" for index in range(args.devices)]
+    devices = FakeDeviceBackend(SystemClock(), names)
+    Backends.install(devices=devices)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".events", delete=False) as script:
+        script_path = script.name
+
+    watcher = HotplugWatcher((sys.executable, "-m", "benchmarks.pactl_stub", script_path))
+    latencies = list()
+    missed = 0
+
+    try:
+        watcher.start()
+
+        if not wait_for(watcher.is_active, 10):
+            raise RuntimeError("Hot-plug watcher did not start")
+
+        for cycle in range(args.cycles):
+            name = names[cycle % len(names)]
+            connected = devices.is_connected(name)
+            event = "remove" if connected else "new"
+
+            if connected:
+                devices.disconnect(name)
+            else:
+                devices.connect(name)
+
+            started = time.perf_counter()
+
+            with open(script_path, "a") as script:
+                # A real connect announces the card and then its sink
+                script.write(f"Event '{event}' on card #{cycle}\n")
+                script.write(f"Event '{event}' on sink #{cycle}\n")
+
+            if wait_for(lambda: (name in device_registry.get_snapshot(max_age=float("inf")).names) != connected, args.timeout):
+                latencies.append(time.perf_counter() - started)
+            else:
+                missed += 1
+
+        enumerations = devices.enumerations
+        time.sleep(args.idle_seconds)
+        idle_enumerations = devices.enumerations - enumerations
+    finally:
+        watcher.stop()
+        engine.stop()
+        Backends.reset()
+        os.unlink(script_path)
+
+    return {
+        "cycles": args.cycles,
+        "missed": missed,
+        "enumerations": devices.enumerations,
+        "rescans": devices.rescans,
+        "idle_seconds": args.idle_seconds,
+        "idle_enumerations": idle_enumerations,
+        "detection_ms": {
+            "median": statistics.median(latencies) * 1000 if latencies else None,
+            "max": max(latencies) * 1000 if latencies else None
+        }
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure hot-plug detection through a scripted pactl subscribe stand-in.")
+    parser.add_argument("--devices", type=int, default=3, help="number of fake headsets")
+    parser.add_argument("--cycles", type=int, default=20, help="connect or disconnect events to send")
+    parser.add_argument("--timeout", type=float, default=5.0, help="seconds to wait for each change to be detected")
+    parser.add_argument("--idle-seconds", type=float, default=2.0, help="quiet period in which no enumeration should happen")
+    parser.add_argument("--verbose", action="store_true", help="keep application logging enabled")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+
+    print(json.dumps(run_hotplug(args), indent=4))
+
+if __name__ == "__main__":
+    main()
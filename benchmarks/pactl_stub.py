@@ -0,0 +1,19 @@
+import sys
+import time
+
+POLL_SECONDS = 0.01
+
+def main() -> None:
+    # Stands in for `pactl subscribe`: echoes every line appended to the script file, like the sound server would
+    with open(sys.argv[1]) as script:
+        while True:
+            line = script.readline()
+
+            if line:
+                sys.stdout.write(line)
+                sys.stdout.flush()
+            else:
+                time.sleep(POLL_SECONDS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from loguru import logger
+from src.core.config import Config
+from src.core.engine import engine
+from src.core.settings_watcher import SettingsWatcher
+
+def write_external(path: Path, settings: dict, atomic: bool) -> None:
+    content = json.dumps(settings)
+
+    if not atomic:
+        with open(path, "w") as file:
+            file.write(content)
+
+        return
+
+    # Configuration management tools usually write a temporary file and rename it over the target
+    temp_path = path.with_name(path.name + ".deploy")
+
+    with open(temp_path, "w") as file:
+        file.write(content)
+
+    os.replace(temp_path, path)
+
+def run_settings_reload(args: argparse.Namespace) -> dict:
+    original_path = Config.SETTINGS_FILE_PATH
+    changes = list()
+    received = threading.Event()
+
+    def on_change(diff: dict) -> None:
+        changes.append(diff)
+        received.set()
+
+    with tempfile.TemporaryDirectory() as directory:
+        Config.SETTINGS_FILE_PATH = Path(directory) / "settings.json"
+        settings = dict(Config.DEFAULT_SETTINGS)
+        Config.save_settings(settings)
+
+        watcher = SettingsWatcher(Config.SETTINGS_FILE_PATH)
+        watcher.subscribe(on_change)
+        latencies = list()
+        missed = 0
+
+        try:
+            watcher.start()
+            time.sleep(0.5)
+            inotify = watcher.is_active()
+
+            for edit in range(args.edits):
+                settings["interval"] = edit + 10
+                received.clear()
+                started = time.perf_counter()
+                write_external(Config.SETTINGS_FILE_PATH, settings, edit % 2 == 0)
+
+                if received.wait(args.timeout) and changes[-1] == {"interval": edit + 10}:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    missed += 1
+
+            # Neither this process's own save nor a file that fails validation may reach the subscribers
+            received.clear()
+            settings["volume"] = 0.25
+            Config.save_settings(settings)
+            own_write_notified = received.wait(args.timeout)
+
+            write_external(Config.SETTINGS_FILE_PATH, dict(settings, interval="soon"), True)
+            invalid_write_notified = received.wait(args.timeout)
+        finally:
+            watcher.stop()
+            engine.stop()
+            Config.SETTINGS_FILE_PATH = original_path
+
+    return {
+        "edits": args.edits,
+        "missed": missed,
+        "inotify": inotify,
+        "own_write_notified": own_write_notified,
+        "invalid_write_notified": invalid_write_notified,
+        "reload_ms": {
+            "median": statistics.median(latencies) * 1000 if latencies else None,
+            "max": max(latencies) * 1000 if latencies else None
+        }
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how quickly external edits to the settings file reach the running app.")
+    parser.add_argument("--edits", type=int, default=10, help="external edits to make, alternating atomic renames and in-place writes")
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds to wait for each edit to be applied")
+    parser.add_argument("--verbose", action="store_true", help="keep application logging enabled")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+
+    print(json.dumps(run_settings_reload(args), indent=4))
+
+if __name__ == "__main__":
+    main()
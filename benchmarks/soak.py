@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from loguru import logger
+from src.core.backends import Backends, SoundDeviceBackend
+from src.core.config import Config
+from src.core.device_monitor import DeviceMonitor
+from src.core.device_registry import device_registry
+from src.core.engine import engine
+from src.core.hotplug import HotplugWatcher, hotplug_watcher
+from src.core.idle_learner import IdleTimeoutLearner
+from src.core.journal import journal
+from src.core.settings_store import SettingsStore
+from .fakes import FakeActivityProbe, FakeClock, FakeDecoder, FakeDeviceBackend, FakeOutputBackend
+
+HOUR = 3600.0
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def schedule_churn(clock: FakeClock, devices: FakeDeviceBackend, targets: list, args: argparse.Namespace, rng: random.Random) -> None:
+    if args.churn_per_hour <= 0:
+        return
+
+    def toggle(name: str) -> None:
+        if devices.is_connected(name):
+            devices.disconnect(name)
+        else:
+            devices.connect(name)
+
+    horizon = args.hours * HOUR
+
+    for name in targets:
+        when = rng.expovariate(args.churn_per_hour / HOUR)
+
+        while when < horizon:
+            clock.call_at(when, lambda name=name: toggle(name))
+            when += rng.expovariate(args.churn_per_hour / HOUR)
+
+def connect_latencies(devices: FakeDeviceBackend, plays: list, horizon: float) -> tuple:
+    latencies = list()
+    missed = 0
+
+    for position, (connected_at, name, event) in enumerate(devices.events):
+        if event != "connect":
+            continue
+
+        disconnected_at = next((when for when, other, kind in devices.events[position + 1:] if other == name and kind == "disconnect"), horizon)
+        first_play = next((played_at for played_at, played_name, _ in plays if played_name == name and connected_at <= played_at < disconnected_at), None)
+
+        if first_play is None:
+            missed += 1
+        else:
+            latencies.append(first_play - connected_at)
+
+    return latencies, missed
+
+def schedule_idle_timeouts(clock: FakeClock, devices: FakeDeviceBackend, output: FakeOutputBackend, args: argparse.Namespace) -> dict:
+    stats = {"idle_disconnects": 0}
+
+    if args.idle_timeout <= 0:
+        return stats
+
+    last_play = dict()
+
+    def expire(name: str, played_at: float) -> None:
+        # The headset powers off when nothing played for the idle timeout, and the user turns it back on later
+        if last_play.get(name) == played_at and devices.is_connected(name):
+            devices.disconnect(name)
+            stats["idle_disconnects"] += 1
+            clock.call_at(clock.monotonic() + args.reconnect_after * 60, lambda: devices.connect(name))
+
+    def on_play(played_at: float, name: str, duration: float) -> None:
+        last_play[name] = played_at
+        clock.call_at(played_at + args.idle_timeout * 60, lambda: expire(name, played_at))
+
+    output.listeners.append(on_play)
+    return stats
+
+def simulate_hotplug_events(clock: FakeClock, devices: FakeDeviceBackend) -> None:
+    # Stands in for pactl subscribe: each change marks the device list stale once the watcher's debounce has passed
+    # and wakes the monitor, which then enumerates exactly once
+    def on_change(name: str, kind: str) -> None:
+        clock.call_at(clock.monotonic() + HotplugWatcher.DEBOUNCE_SECONDS, notify)
+
+    def notify() -> None:
+        device_registry.invalidate()
+        clock.interrupt()
+
+    devices.listeners.append(on_change)
+    hotplug_watcher.is_active = lambda: True
+
+def run_soak(args: argparse.Namespace) -> dict:
+    horizon = args.hours * HOUR
+    rng = random.Random(args.seed)
+    targets = [f"fake headset {index}" for index in range(args.devices)]
+    others = [f"fake speaker {index}" for index in range(args.other_endpoints)]
+
+    clock = FakeClock(horizon)
+    devices = FakeDeviceBackend(clock, targets + others, args.enumeration_delay)
+    output = FakeOutputBackend(clock)
+    decoder = FakeDecoder(clock, args.decode_delay)
+    activity = FakeActivityProbe(args.busy_fraction, args.seed)
+    Backends.install(devices, output, decoder, clock, activity)
+
+    # The soak must not pick up the host's sound server; --hotplug simulates one instead
+    hotplug_watcher.command = ()
+
+    if args.hotplug:
+        simulate_hotplug_events(clock, devices)
+
+    journal_dir = tempfile.mkdtemp()
+    journal.path = Path(journal_dir) / "soak.journal"
+
+    rss_samples = [rss_bytes()]
+
+    def sample_rss(when: float) -> None:
+        rss_samples.append(rss_bytes())
+
+        if when + HOUR <= horizon:
+            clock.call_at(when + HOUR, lambda: sample_rss(when + HOUR))
+
+    clock.call_at(HOUR, lambda: sample_rss(HOUR))
+    schedule_churn(clock, devices, targets, args, rng)
+    idle_stats = schedule_idle_timeouts(clock, devices, output, args)
+
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
+        audio_path = audio_file.name
+
+    settings = dict(Config.DEFAULT_SETTINGS, devices=targets, audio_file_path=audio_path, interval=args.interval, adaptive_interval=args.adaptive)
+    learner = IdleTimeoutLearner(None)
+    monitor = DeviceMonitor(SettingsStore(settings), learner)
+    started = time.perf_counter()
+
+    try:
+        monitor.start()
+        clock.wait_until(horizon)
+        stop_started = time.perf_counter()
+        monitor.stop()
+        stop_seconds = time.perf_counter() - stop_started
+        journal_records = len(journal.records())
+    finally:
+        engine.stop()
+        Backends.reset()
+        vars(hotplug_watcher).pop("is_active", None)
+        journal.close()
+        os.unlink(audio_path)
+        shutil.rmtree(journal_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    latencies, missed = connect_latencies(devices, output.plays, horizon)
+
+    return {
+        "simulated_hours": args.hours,
+        "hotplug_events": args.hotplug,
+        "wall_seconds": elapsed,
+        "stop_ms": stop_seconds * 1000,
+        "devices": args.devices,
+        "other_endpoints": args.other_endpoints,
+        "loop_wakeups": clock.waits,
+        "loop_wakeups_per_hour": clock.waits / args.hours,
+        "plays": len(output.plays),
+        "stream_opens": output.opens,
+        "decodes": decoder.decodes,
+        "activity_probes": activity.probes,
+        "journal_records": journal_records,
+        "idle_disconnects": idle_stats["idle_disconnects"],
+        "learned_intervals_min": {name: learner.interval_seconds(name, args.interval * 60, Config.DEFAULT_SETTINGS["adaptive_safety_margin"], Config.DEFAULT_SETTINGS["adaptive_interval_max"] * 60) / 60 for name in targets},
+        "enumerations": devices.enumerations,
+        "enumerations_per_hour": devices.enumerations / args.hours,
+        "enumeration_cpu_ms_mean": devices.enumeration_cpu_seconds / max(devices.enumerations, 1) * 1000,
+        "enumeration_simulated_seconds": devices.enumerations * args.enumeration_delay,
+        "connects": len(latencies) + missed,
+        "connects_without_play": missed,
+        "connect_to_first_play_s": {
+            "median": statistics.median(latencies) if latencies else None,
+            "p95": percentile(latencies, 0.95) if latencies else None,
+            "max": max(latencies) if latencies else None
+        },
+        "rss_mb": {
+            "start": rss_samples[0] / 2 ** 20,
+            "end": rss_samples[-1] / 2 ** 20,
+            "max": max(rss_samples) / 2 ** 20
+        }
+    }
+
+def run_settings_writes(args: argparse.Namespace) -> dict:
+    original_path = Config.SETTINGS_FILE_PATH
+    original_write = Config.write_settings
+    calls = {"requested": 0, "written": 0}
+
+    def counting_write(content: str) -> None:
+        calls["requested"] += 1
+        previous_hash = Config._last_saved_hash
+        original_write(content)
+        calls["written"] += Config._last_saved_hash != previous_hash
+
+    with tempfile.TemporaryDirectory() as directory:
+        Config.SETTINGS_FILE_PATH = Path(directory) / "settings.json"
+        Config.write_settings = counting_write
+        started = time.perf_counter()
+
+        try:
+            settings = dict(Config.DEFAULT_SETTINGS)
+
+            for step in range(args.slider_events):
+                settings["volume"] = step / args.slider_events
+                Config.schedule_save(settings)
+                time.sleep(args.slider_period)
+
+            Config.flush_settings()
+        finally:
+            Config.write_settings = original_write
+            Config.SETTINGS_FILE_PATH = original_path
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "slider_events": args.slider_events,
+        "seconds": elapsed,
+        "writes": calls["written"],
+        "writes_per_second": calls["written"] / elapsed
+    }
+
+def run_real_enumerations(args: argparse.Namespace) -> dict:
+    backend = SoundDeviceBackend()
+    durations = list()
+
+    for _ in range(args.real_enumerations):
+        started = time.perf_counter()
+        devices = backend.query_output_devices()
+        durations.append(time.perf_counter() - started)
+
+    return {
+        "calls": len(durations),
+        "output_devices": len(devices),
+        "first_ms": durations[0] * 1000,
+        "median_ms": statistics.median(durations) * 1000
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Soak-test DeviceMonitor against fake audio backends in accelerated time.")
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated duration")
+    parser.add_argument("--devices", type=int, default=3, help="number of target headsets")
+    parser.add_argument("--other-endpoints", type=int, default=12, help="number of non-target output endpoints")
+    parser.add_argument("--interval", type=float, default=5, help="keep-alive interval in minutes")
+    parser.add_argument("--churn-per-hour", type=float, default=1.0, help="hot-plug toggles per target per hour")
+    parser.add_argument("--enumeration-delay", type=float, default=0.2, help="simulated seconds per enumeration")
+    parser.add_argument("--decode-delay", type=float, default=0.5, help="simulated seconds per decode")
+    parser.add_argument("--busy-fraction", type=float, default=0.0, help="chance that a target is already carrying audio when its tick is due")
+    parser.add_argument("--idle-timeout", type=float, default=0, help="simulated headset idle auto-off in minutes (0 disables)")
+    parser.add_argument("--reconnect-after", type=float, default=2, help="minutes until the user turns an idled-off headset back on")
+    parser.add_argument("--adaptive", action="store_true", help="let the monitor learn and stretch the interval per device")
+    parser.add_argument("--hotplug", action="store_true", help="deliver device changes as hot-plug events instead of relying on polling")
+    parser.add_argument("--slider-events", type=int, default=200, help="volume slider events for the settings-write benchmark")
+    parser.add_argument("--slider-period", type=float, default=0.01, help="real seconds between slider events")
+    parser.add_argument("--real-enumerations", type=int, default=0, help="also time this many sounddevice enumerations on the real hardware")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="keep application logging enabled")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+
+    report = {
+        "soak": run_soak(args),
+        "settings_writes": run_settings_writes(args)
+    }
+
+    if args.real_enumerations > 0:
+        report["real_enumeration"] = run_real_enumerations(args)
+
+    print(json.dumps(report, indent=4))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+FIRST_FRAME_MARKER = "KEEPALIVE_FIRST_FRAME"
+BACKEND_MODULES = ("sounddevice", "pygame", "numpy")
+
+def measure_first_frame(command: list, timeout: float) -> float:
+    env = dict(os.environ, KEEPALIVE_STARTUP_PROBE="1")
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+    try:
+        for line in process.stdout:
+            if line.strip() == FIRST_FRAME_MARKER:
+                return time.perf_counter() - start
+
+        raise RuntimeError(f"Process exited without drawing a frame: {command}")
+    finally:
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def measure_imports(module: str) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    imports = list()
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        _, timings = line.split(":", 1)
+        self_us, cumulative_us, name = (part.strip() for part in timings.split("|"))
+        imports.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+
+    return imports
+
+def run(args: argparse.Namespace) -> dict:
+    command = [args.executable] if args.executable else [sys.executable, "-m", "src.main"]
+    first_frame = [measure_first_frame(command, args.timeout) for _ in range(args.runs)]
+    imports = measure_imports(args.module)
+    loaded = {entry["module"].split(".")[0] for entry in imports}
+
+    return {
+        "command": command,
+        "runs": args.runs,
+        "first_frame_ms": {
+            "median": statistics.median(first_frame) * 1000,
+            "min": min(first_frame) * 1000,
+            "max": max(first_frame) * 1000
+        },
+        "import_module": args.module,
+        "import_total_ms": sum(entry["self_ms"] for entry in imports),
+        "backends_imported": sorted(loaded.intersection(BACKEND_MODULES)),
+        "top_imports": sorted(imports, key=lambda entry: entry["cumulative_ms"], reverse=True)[:args.top]
+    }
+
+def print_report(report: dict) -> None:
+    frame = report["first_frame_ms"]
+    print(f"Time to first frame ({report['runs']} runs): median {frame['median']:.1f} ms, min {frame['min']:.1f} ms, max {frame['max']:.1f} ms")
+    print(f"Import of {report['import_module']}: {report['import_total_ms']:.1f} ms")
+    print(f"Audio backends imported before the first frame: {', '.join(report['backends_imported']) or 'none'}")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>10}  module")
+
+    for entry in report["top_imports"]:
+        print(f"{entry['cumulative_ms']:>14.1f} {entry['self_ms']:>10.1f}  {entry['module']}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure KeepAlive time-to-first-frame and per-module import cost.")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--executable", help="time a frozen build instead of python -m src.main")
+    parser.add_argument("--module", default="src.gui.app", help="module whose import cost is broken down")
+    parser.add_argument("--top", type=int, default=20, help="number of most expensive imports to list")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for each start")
+    parser.add_argument("--budget-ms", type=float, help="fail if the median time to first frame exceeds this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print_report(report)
+
+    if args.budget_ms is not None and report["first_frame_ms"]["median"] > args.budget_ms:
+        print(f"Median time to first frame exceeds the {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import wave
+from pathlib import Path
+from typing import NamedTuple
+from loguru import logger
+import numpy as np
+from .backends import Backends
+from .clip import Clip
+
+OUTPUT_SAMPLERATE = 48000
+SILENCE_THRESHOLD_DBFS = -50.0
+TARGET_LOUDNESS_DBFS = -20.0
+EDGE_PADDING_SECONDS = 0.01
+PCM_SCALE = 32767.0
+
+
+class ImportedAudio(NamedTuple):
+    path: Path
+    content_hash: str
+    loudness_dbfs: float
+    duration: float
+
+
+def _dbfs(level: float) -> float:
+    return 20 * np.log10(max(level, 1e-10))
+
+
+def rms_dbfs(samples: np.ndarray) -> float:
+    return _dbfs(float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))) if samples.size else _dbfs(0.0)
+
+
+def trim_silence(samples: np.ndarray, samplerate: int, threshold_dbfs: float = SILENCE_THRESHOLD_DBFS) -> np.ndarray:
+    audible = np.flatnonzero(np.abs(samples).max(axis=1) > 10 ** (threshold_dbfs / 20))
+
+    if not audible.size:
+        return samples[:0]
+
+    padding = int(EDGE_PADDING_SECONDS * samplerate)
+    return samples[max(0, audible[0] - padding):audible[-1] + padding + 1]
+
+
+def normalize(samples: np.ndarray, target_dbfs: float = TARGET_LOUDNESS_DBFS) -> np.ndarray:
+    peak = float(np.abs(samples).max()) if samples.size else 0.0
+
+    if peak == 0.0:
+        return samples
+
+    # Bring the clip to the target loudness, but never so far that it would clip
+    gain = min(10 ** ((target_dbfs - rms_dbfs(samples)) / 20), 1.0 / peak)
+    return (samples * np.float32(gain)).astype(np.float32)
+
+
+def to_pcm(samples: np.ndarray) -> np.ndarray:
+    return np.round(np.clip(samples, -1.0, 1.0) * PCM_SCALE).astype("<i2")
+
+
+def write_pcm_wav(path: Path, pcm: np.ndarray, samplerate: int) -> None:
+    temp_path = path.with_name(path.name + ".tmp")
+
+    with wave.open(str(temp_path), "wb") as file:
+        file.setnchannels(pcm.shape[1])
+        file.setsampwidth(2)
+        file.setframerate(samplerate)
+        file.writeframes(pcm.tobytes())
+
+    os.replace(temp_path, path)
+
+
+def read_pcm_wav(file_path: str) -> Clip | None:
+    # The wave module only reads integer PCM; float and extensible files are left to the full decoder
+    try:
+        with wave.open(file_path, "rb") as file:
+            if file.getsampwidth() != 2 or file.getcomptype() != "NONE":
+                return None
+
+            channels = file.getnchannels()
+            samplerate = file.getframerate()
+            pcm = np.frombuffer(file.readframes(file.getnframes()), dtype="<i2")
+    except (wave.Error, EOFError):
+        return None
+
+    return Clip(pcm.reshape(-1, channels).astype(np.float32) / PCM_SCALE, samplerate)
+
+
+def import_audio(file_path: str, directory: Path) -> ImportedAudio:
+    clip = Backends.decoder.decode(file_path)
+
+    # Keep-alive clips gain nothing from stereo, and playback upmixes to whatever the device needs
+    samples = clip.render(OUTPUT_SAMPLERATE, 1)
+    samples = trim_silence(samples, OUTPUT_SAMPLERATE)
+
+    if not samples.size:
+        raise ValueError("The audio file contains only silence")
+
+    samples = normalize(samples)
+    pcm = to_pcm(samples)
+    content_hash = hashlib.sha256(pcm.tobytes()).hexdigest()
+    path = directory / f"{content_hash[:16]}.wav"
+
+    if path.exists():
+        logger.info(f"Audio already imported as {path.name}")
+    else:
+        directory.mkdir(parents=True, exist_ok=True)
+        write_pcm_wav(path, pcm, OUTPUT_SAMPLERATE)
+        logger.info(f"Audio imported as {path.name}")
+
+    return ImportedAudio(path, content_hash, round(float(rms_dbfs(samples)), 2), len(samples) / OUTPUT_SAMPLERATE)
@@ -1,14 +1,29 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
-import pygame
-from pathlib import Path
+import numpy as np
+from .backends import Backends, DeviceInfo
+from .clip import Clip
+from .clip_cache import ClipCache
+from .journal import journal, JournalEvent
+from .metrics import play_failures_total, play_seconds, plays_total
+from .stream_pool import OutputStreamPool
 
 class AudioPlayer:
     _is_mixer_init = False
+    _stream_pool = OutputStreamPool()
+    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="keepalive-playback")
+
+    @staticmethod
+    def is_mixer_init() -> bool:
+        return AudioPlayer._is_mixer_init
 
     @staticmethod
     def init_mixer() -> None:
         if not AudioPlayer._is_mixer_init:
             try:
+                import pygame
+
                 pygame.mixer.init()
                 AudioPlayer._is_mixer_init = True
 
@@ -20,9 +35,10 @@ class AudioPlayer:
     def quit_mixer() -> None:
         if AudioPlayer._is_mixer_init:
             try:
+                import pygame
+
                 if pygame.mixer.get_busy():
-                    pygame.mixer.music.stop()
-                    pygame.mixer.music.unload()
+                    pygame.mixer.stop()
 
                 pygame.mixer.quit()
                 AudioPlayer._is_mixer_init = False
@@ -31,20 +47,70 @@ class AudioPlayer:
             except Exception as e:
                 logger.error(f"Failed to quit mixer: {e}")
 
+    _clip_cache = ClipCache(lambda file_path: Backends.decoder.decode(file_path), lambda clip: clip.nbytes)
+
     @staticmethod
-    def play_audio(file_path: str, volume: float) -> None:
-        if not Path(file_path).exists():
-            logger.error(f"Audio file not found: {file_path}")
-            return
+    def cache_stats() -> dict:
+        return AudioPlayer._clip_cache.stats()
 
-        if not AudioPlayer._is_mixer_init:
-            AudioPlayer.init_mixer()
+    @staticmethod
+    def load_clip(file_path: str) -> Clip | None:
+        return AudioPlayer._clip_cache.get(file_path)
+
+    @staticmethod
+    def prewarm(devices: list) -> None:
+        AudioPlayer._stream_pool.prewarm(devices)
+
+    @staticmethod
+    def release_outputs() -> None:
+        AudioPlayer._stream_pool.close_all()
+
+    @staticmethod
+    def _play_on_device(clip: Clip, device: DeviceInfo | None, volume: float) -> float:
+        samplerate, channels = OutputStreamPool.stream_format(device, clip.samplerate, clip.channels)
+        buffer = clip.render(samplerate, channels) * np.float32(volume)
+        started = time.perf_counter()
+        stream = AudioPlayer._stream_pool.acquire(device, samplerate, channels)
 
         try:
-            pygame.mixer.music.load(file_path)
-            pygame.mixer.music.set_volume(volume)
-            pygame.mixer.music.play()
+            stream.write(buffer)
+        finally:
+            OutputStreamPool.release(stream)
+
+        duration = time.perf_counter() - started
+        play_seconds.observe(duration)
+
+        return duration
+
+    @staticmethod
+    def play_batch(clip: Clip, targets: list) -> None:
+        futures = {AudioPlayer._executor.submit(AudioPlayer._play_on_device, clip, device, volume): device for device, volume in targets}
+
+        for future, device in futures.items():
+            name = "default output" if device is None else device.name
+
+            try:
+                duration = future.result()
+                plays_total.inc()
+                journal.append(JournalEvent.PLAY, None if device is None else device.name, duration)
+                logger.info(f"Played audio on {name}")
+            except Exception as e:
+                play_failures_total.inc()
+                journal.append(JournalEvent.PLAY_FAILED, None if device is None else device.name)
+                logger.error(f"Failed to play audio on {name}: {e}")
+
+        AudioPlayer._stream_pool.close_all()
+
+    @staticmethod
+    def play_clip(clip: Clip, volume: float, devices: list | None = None) -> None:
+        AudioPlayer.play_batch(clip, [(device, volume) for device in devices or [None]])
+
+    @staticmethod
+    def play_audio(file_path: str, volume: float, devices: list | None = None) -> None:
+        clip = AudioPlayer.load_clip(file_path)
+
+        if clip is None:
+            return
 
-            logger.info(f"Playing audio: {file_path}")
-        except Exception as e:
-            logger.error(f"Failed to play audio: {e}")
+        logger.info(f"Playing audio: {file_path}")
+        AudioPlayer.play_clip(clip, volume, devices)
@@ -0,0 +1,361 @@
+import atexit
+import itertools
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+from loguru import logger
+from .backends import Backends, ChainedActivityProbe, DeviceInfo, LoopbackActivityProbe, NullActivityProbe, PygameDecoder, SoundDeviceBackend
+from .metrics import audio_worker_restarts_total
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .clip import Clip
+
+
+class AudioWorkerError(RuntimeError):
+    pass
+
+
+class _WorkerService:
+    def __init__(self) -> None:
+        self._sound_device = SoundDeviceBackend()
+        self._decoder = PygameDecoder()
+        self._activity = ChainedActivityProbe(LoopbackActivityProbe(), NullActivityProbe())
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._streams = dict()
+        self._buffers = dict()
+        self._exports = dict()
+
+    def query_output_devices(self) -> tuple:
+        return self._sound_device.query_output_devices()
+
+    def rescan(self) -> bool:
+        return self._sound_device.rescan()
+
+    def open_stream(self, device: DeviceInfo | None, samplerate: int, channels: int) -> int:
+        stream = self._sound_device.open_stream(device, samplerate, channels)
+
+        with self._lock:
+            stream_id = next(self._ids)
+            self._streams[stream_id] = stream
+
+        return stream_id
+
+    def write(self, stream_id: int, buffer_name: str, shape: tuple) -> None:
+        with self._lock:
+            stream = self._streams[stream_id]
+            buffer = self._buffers.get(stream_id)
+
+            if buffer is None or buffer.name != buffer_name:
+                if buffer is not None:
+                    buffer.close()
+
+                buffer = SharedMemory(name=buffer_name)
+                self._buffers[stream_id] = buffer
+
+        import numpy as np
+
+        samples = np.ndarray(shape, dtype=np.float32, buffer=buffer.buf)
+
+        try:
+            stream.write(samples)
+        finally:
+            del samples
+
+    def stop(self, stream_id: int) -> None:
+        with self._lock:
+            stream = self._streams.get(stream_id)
+
+        if stream is not None:
+            stream.stop()
+
+    def close(self, stream_id: int) -> None:
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+            buffer = self._buffers.pop(stream_id, None)
+
+        if buffer is not None:
+            buffer.close()
+
+        if stream is not None:
+            stream.close()
+
+    def decode(self, file_path: str) -> tuple:
+        import numpy as np
+
+        clip = self._decoder.decode(file_path)
+        buffer = SharedMemory(create=True, size=max(clip.nbytes, 1))
+        np.ndarray(clip.samples.shape, dtype=np.float32, buffer=buffer.buf)[:] = clip.samples
+
+        # The block stays open here until the parent has copied it out, otherwise Windows would free it early
+        with self._lock:
+            self._exports[buffer.name] = buffer
+
+        return buffer.name, clip.samples.shape, clip.samplerate
+
+    def release(self, buffer_name: str) -> None:
+        with self._lock:
+            buffer = self._exports.pop(buffer_name, None)
+
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        return self._activity.is_active(device, threshold)
+
+
+def _serve(connection) -> None:
+    # Ctrl+C and service managers signal the whole process group; the parent decides when the worker stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    service = _WorkerService()
+    executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="keepalive-audio-worker")
+    send_lock = threading.Lock()
+
+    def dispatch(call_id: int, method: str, args: tuple) -> None:
+        try:
+            reply = (call_id, True, getattr(service, method)(*args))
+        except Exception as e:
+            reply = (call_id, False, f"{type(e).__name__}: {e}")
+
+        with send_lock:
+            connection.send(reply)
+
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+
+        if message is None:
+            break
+
+        executor.submit(dispatch, *message)
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AudioWorker:
+    CALL_TIMEOUT = 5.0
+    ENUMERATION_TIMEOUT = 10.0
+    DECODE_TIMEOUT = 15.0
+    WRITE_GRACE_SECONDS = 5.0
+    SHUTDOWN_TIMEOUT = 2.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+        self._ids = itertools.count()
+        self._process = None
+        self._connection = None
+        self._pending = dict()
+        self.generation = 0
+
+    def _start(self) -> None:
+        connection, child_connection = self._context.Pipe()
+        process = self._context.Process(target=_serve, args=(child_connection,), name="keepalive-audio", daemon=True)
+        process.start()
+        child_connection.close()
+
+        self._process = process
+        self._connection = connection
+        self.generation += 1
+
+        threading.Thread(target=self._read_replies, args=(connection, self.generation), name="keepalive-audio-replies", daemon=True).start()
+        logger.info(f"Audio worker started with pid {process.pid}")
+
+    def _read_replies(self, connection, generation: int) -> None:
+        while True:
+            try:
+                call_id, ok, value = connection.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                future = self._pending.pop(call_id, None)
+
+            if future is None:
+                continue
+
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(AudioWorkerError(value))
+
+        self._discard(generation, "Audio worker exited unexpectedly")
+
+    def _discard(self, generation: int, reason: str) -> None:
+        with self._lock:
+            if generation != self.generation or self._process is None:
+                return
+
+            process, connection = self._process, self._connection
+            pending = list(self._pending.values())
+            self._process = None
+            self._connection = None
+            self._pending.clear()
+            self.generation += 1
+
+        logger.error(f"{reason}, restarting it")
+        audio_worker_restarts_total.inc()
+
+        if process.is_alive():
+            process.kill()
+
+        process.join(self.SHUTDOWN_TIMEOUT)
+        connection.close()
+
+        for future in pending:
+            future.set_exception(AudioWorkerError(reason))
+
+    def call(self, method: str, *args, timeout: float = CALL_TIMEOUT):
+        future = Future()
+
+        with self._lock:
+            if self._process is None:
+                self._start()
+
+            call_id = next(self._ids)
+            generation = self.generation
+            self._pending[call_id] = future
+            self._connection.send((call_id, method, args))
+
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Watchdog: a driver call that overruns its deadline is assumed hung, so the whole worker is replaced
+            self._discard(generation, f"Audio worker call {method} exceeded {timeout:.1f} s")
+            raise AudioWorkerError(f"{method} timed out after {timeout:.1f} s") from None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            process, connection = self._process, self._connection
+            pending = list(self._pending.values())
+            self._process = None
+            self._connection = None
+            self._pending.clear()
+            self.generation += 1
+
+        for future in pending:
+            future.set_exception(AudioWorkerError("Audio worker stopped"))
+
+        if process is None:
+            return
+
+        try:
+            connection.send(None)
+        except OSError:
+            pass
+
+        process.join(self.SHUTDOWN_TIMEOUT)
+
+        if process.is_alive():
+            process.kill()
+            process.join(self.SHUTDOWN_TIMEOUT)
+
+        connection.close()
+        logger.info("Audio worker stopped")
+
+
+class WorkerStream:
+    def __init__(self, worker: AudioWorker, stream_id: int, samplerate: int, channels: int) -> None:
+        self._worker = worker
+        self._generation = worker.generation
+        self._stream_id = stream_id
+        self._buffer = None
+        self._closed = False
+        self.samplerate = samplerate
+        self.channels = channels
+
+    @property
+    def active(self) -> bool:
+        return not self._closed and self._generation == self._worker.generation
+
+    def _stage(self, data: "np.ndarray") -> None:
+        import numpy as np
+
+        if self._buffer is None or self._buffer.size < data.nbytes:
+            self._release_buffer()
+            self._buffer = SharedMemory(create=True, size=max(data.nbytes, 1))
+
+        staged = np.ndarray(data.shape, dtype=np.float32, buffer=self._buffer.buf)
+        staged[:] = data
+        del staged
+
+    def _release_buffer(self) -> None:
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer.unlink()
+            self._buffer = None
+
+    def write(self, data) -> None:
+        if not self.active:
+            raise AudioWorkerError("Output stream belongs to a stopped audio worker")
+
+        import numpy as np
+
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        self._stage(data)
+        self._worker.call("write", self._stream_id, self._buffer.name, data.shape, timeout=len(data) / self.samplerate + AudioWorker.WRITE_GRACE_SECONDS)
+
+    def stop(self) -> None:
+        if self.active:
+            self._worker.call("stop", self._stream_id)
+
+    def close(self) -> None:
+        try:
+            if self.active:
+                self._worker.call("close", self._stream_id)
+        finally:
+            self._closed = True
+            self._release_buffer()
+
+
+class WorkerBackend:
+    def __init__(self, worker: AudioWorker) -> None:
+        self._worker = worker
+
+    def query_output_devices(self) -> tuple:
+        return self._worker.call("query_output_devices", timeout=AudioWorker.ENUMERATION_TIMEOUT)
+
+    def rescan(self) -> bool:
+        return self._worker.call("rescan", timeout=AudioWorker.ENUMERATION_TIMEOUT + SoundDeviceBackend.RESCAN_WAIT_SECONDS)
+
+    def open_stream(self, device: DeviceInfo | None, samplerate: int, channels: int) -> WorkerStream:
+        return WorkerStream(self._worker, self._worker.call("open_stream", device, samplerate, channels), samplerate, channels)
+
+    def decode(self, file_path: str) -> "Clip":
+        import numpy as np
+        from .clip import Clip
+
+        buffer_name, shape, samplerate = self._worker.call("decode", file_path, timeout=AudioWorker.DECODE_TIMEOUT)
+
+        try:
+            buffer = SharedMemory(name=buffer_name)
+
+            try:
+                samples = np.ndarray(shape, dtype=np.float32, buffer=buffer.buf).copy()
+            finally:
+                buffer.close()
+        finally:
+            self._worker.call("release", buffer_name)
+
+        return Clip(samples, samplerate)
+
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        return self._worker.call("is_active", device, threshold)
+
+
+def install_audio_worker() -> AudioWorker:
+    worker = AudioWorker()
+    backend = WorkerBackend(worker)
+    Backends.install(devices=backend, output=backend, decoder=backend, activity=ChainedActivityProbe(backend, NullActivityProbe()))
+    atexit.register(worker.shutdown)
+
+    return worker
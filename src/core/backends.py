@@ -0,0 +1,287 @@
+import asyncio
+import threading
+import time
+import weakref
+from typing import NamedTuple, Protocol
+from loguru import logger
+
+# Every PortAudio call that opens a stream or reads the device list holds this, so a rescan never terminates the library
+# under a probe recording or an output stream being opened
+_portaudio_lock = threading.Lock()
+
+
+class DeviceInfo(NamedTuple):
+    index: int
+    name: str
+    hostapi: int
+    max_output_channels: int
+    default_samplerate: float
+    hostapi_name: str = ""
+
+
+class OutputStream(Protocol):
+    samplerate: float
+    channels: int
+    active: bool
+
+    def write(self, data) -> None: ...
+    def stop(self) -> None: ...
+    def close(self) -> None: ...
+
+
+class DeviceBackend(Protocol):
+    def query_output_devices(self) -> tuple: ...
+    def rescan(self) -> bool: ...
+
+
+class OutputBackend(Protocol):
+    def open_stream(self, device: DeviceInfo | None, samplerate: int, channels: int) -> OutputStream: ...
+
+
+class DecoderBackend(Protocol):
+    def decode(self, file_path: str): ...
+
+
+class ActivityProbe(Protocol):
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None: ...
+
+
+class Clock(Protocol):
+    def monotonic(self) -> float: ...
+    def time(self) -> float: ...
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> bool: ...
+    def sleep(self, seconds: float) -> None: ...
+
+
+class SoundDeviceBackend:
+    RESCAN_WAIT_SECONDS = 5.0
+
+    def __init__(self) -> None:
+        self._streams = weakref.WeakSet()
+        self._rescan_pending = False
+
+    def query_output_devices(self) -> tuple:
+        import sounddevice as sd
+
+        if self._rescan_pending:
+            self.rescan()
+
+        hostapis = sd.query_hostapis()
+        output_devices = list()
+
+        for index, device in enumerate(sd.query_devices()):
+            if device["max_output_channels"] > 0:
+                output_devices.append(DeviceInfo(
+                    index,
+                    device["name"].lower().strip(),
+                    device["hostapi"],
+                    device["max_output_channels"],
+                    device["default_samplerate"],
+                    hostapis[device["hostapi"]]["name"]
+                ))
+
+        return tuple(output_devices)
+
+    def open_stream(self, device: DeviceInfo | None, samplerate: int, channels: int) -> OutputStream:
+        import sounddevice as sd
+
+        with _portaudio_lock:
+            stream = sd.OutputStream(device=None if device is None else device.index, samplerate=samplerate, channels=channels, dtype="float32")
+            self._streams.add(stream)
+
+        stream.start()
+
+        return stream
+
+    def _has_open_streams(self) -> bool:
+        return any(not stream.closed for stream in list(self._streams))
+
+    def rescan(self) -> bool:
+        import sounddevice as sd
+
+        # Streams are only open around a keep-alive, and terminating PortAudio under one would invalidate it
+        deadline = time.monotonic() + self.RESCAN_WAIT_SECONDS
+
+        while self._has_open_streams() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        with _portaudio_lock:
+            if self._has_open_streams():
+                logger.info("Output streams still open, deferring the PortAudio device rescan")
+                self._rescan_pending = True
+                return False
+
+            # PortAudio builds its device list once at initialization and never updates it on its own
+            sd._terminate()
+            sd._initialize()
+            self._rescan_pending = False
+
+        return True
+
+
+class PygameDecoder:
+    def decode(self, file_path: str):
+        if file_path.lower().endswith(".wav"):
+            from .audio_import import read_pcm_wav
+
+            # Imported clips are plain PCM, which is read directly without starting the SDL mixer
+            clip = read_pcm_wav(file_path)
+
+            if clip is not None:
+                return clip
+
+        import numpy as np
+        import pygame
+        from .audio_player import AudioPlayer
+        from .clip import Clip
+
+        # The mixer is only needed as a decoder, so it is released again once the clip is in memory
+        opened_mixer = not AudioPlayer.is_mixer_init()
+
+        if opened_mixer:
+            AudioPlayer.init_mixer()
+
+        try:
+            frequency, size, _ = pygame.mixer.get_init()
+            samples = pygame.sndarray.array(pygame.mixer.Sound(file_path))
+            scale = float(2 ** (abs(size) - 1))
+
+            return Clip(samples.astype(np.float32) / scale, frequency)
+        finally:
+            if opened_mixer:
+                AudioPlayer.quit_mixer()
+
+
+class NullActivityProbe:
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        return None
+
+
+class LoopbackActivityProbe:
+    SAMPLE_SECONDS = 0.1
+    LOOKUP_TTL = 60.0
+    LOOPBACK_MARKERS = ("[loopback]", "monitor of ")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loopbacks = dict()
+        self._looked_up_at = None
+
+    def _find_loopback(self, device: DeviceInfo) -> dict | None:
+        import sounddevice as sd
+        from .device_matcher import normalize_name
+
+        with self._lock:
+            if self._looked_up_at is None or time.monotonic() - self._looked_up_at > self.LOOKUP_TTL:
+                self._loopbacks = dict()
+
+                with _portaudio_lock:
+                    devices = sd.query_devices()
+
+                # WASAPI exposes "<endpoint> [Loopback]" inputs, PulseAudio and PipeWire "Monitor of <endpoint>" sources
+                for index, info in enumerate(devices):
+                    name = normalize_name(info["name"])
+
+                    if info["max_input_channels"] > 0 and any(marker in name for marker in self.LOOPBACK_MARKERS):
+                        self._loopbacks[name] = dict(info, index=index)
+
+                self._looked_up_at = time.monotonic()
+
+            name = normalize_name(device.name)
+            return next((info for loopback_name, info in self._loopbacks.items() if name in loopback_name), None)
+
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        loopback = self._find_loopback(device)
+
+        if loopback is None:
+            return None
+
+        import numpy as np
+        import sounddevice as sd
+
+        samplerate = loopback["default_samplerate"]
+
+        with _portaudio_lock:
+            samples = sd.rec(
+                int(self.SAMPLE_SECONDS * samplerate),
+                samplerate=samplerate,
+                channels=min(loopback["max_input_channels"], 2),
+                device=loopback["index"],
+                dtype="float32",
+                blocking=True
+            )
+
+        return float(np.max(np.abs(samples))) > threshold
+
+
+class ChainedActivityProbe:
+    def __init__(self, *probes: ActivityProbe) -> None:
+        self.probes = probes
+
+    def is_active(self, device: DeviceInfo, threshold: float) -> bool | None:
+        for probe in self.probes:
+            try:
+                active = probe.is_active(device, threshold)
+            except Exception as e:
+                logger.debug(f"{type(probe).__name__} could not probe {device.name}: {e}")
+                continue
+
+            if active is not None:
+                return active
+
+        return None
+
+
+class SystemClock:
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    async def wait(self, event: asyncio.Event, timeout: float | None) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        return event.is_set()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class Backends:
+    devices: DeviceBackend = SoundDeviceBackend()
+    output: OutputBackend = devices
+    decoder: DecoderBackend = PygameDecoder()
+    clock: Clock = SystemClock()
+    activity: ActivityProbe = ChainedActivityProbe(LoopbackActivityProbe(), NullActivityProbe())
+
+    @staticmethod
+    def install(
+        devices: DeviceBackend | None = None,
+        output: OutputBackend | None = None,
+        decoder: DecoderBackend | None = None,
+        clock: Clock | None = None,
+        activity: ActivityProbe | None = None
+    ) -> None:
+        if devices is not None:
+            Backends.devices = devices
+
+        if output is not None:
+            Backends.output = output
+
+        if decoder is not None:
+            Backends.decoder = decoder
+
+        if clock is not None:
+            Backends.clock = clock
+
+        if activity is not None:
+            Backends.activity = activity
+
+    @staticmethod
+    def reset() -> None:
+        sound_device = SoundDeviceBackend()
+        Backends.install(sound_device, sound_device, PygameDecoder(), SystemClock(), ChainedActivityProbe(LoopbackActivityProbe(), NullActivityProbe()))
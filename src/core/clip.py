@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+
+
+class Clip:
+    def __init__(self, samples: np.ndarray, samplerate: int) -> None:
+        if samples.ndim == 1:
+            samples = samples[:, np.newaxis]
+
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.samples.flags.writeable = False
+        self.samplerate = int(samplerate)
+        self._lock = threading.Lock()
+        self._rendered = dict()
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.samplerate
+
+    @property
+    def nbytes(self) -> int:
+        return self.samples.nbytes + sum(buffer.nbytes for buffer in self._rendered.values())
+
+    def _resample(self, samplerate: int) -> np.ndarray:
+        if samplerate == self.samplerate or len(self.samples) < 2:
+            return self.samples
+
+        frames = max(1, round(len(self.samples) * samplerate / self.samplerate))
+        source_times = np.arange(len(self.samples), dtype=np.float64)
+        target_times = np.linspace(0, len(self.samples) - 1, frames)
+
+        return np.stack([np.interp(target_times, source_times, channel) for channel in self.samples.T], axis=1).astype(np.float32)
+
+    def _remix(self, samples: np.ndarray, channels: int) -> np.ndarray:
+        if channels == samples.shape[1]:
+            return samples
+
+        if channels == 1:
+            return samples.mean(axis=1, keepdims=True, dtype=np.float32)
+
+        if samples.shape[1] == 1:
+            return np.repeat(samples, channels, axis=1)
+
+        return samples[:, :channels]
+
+    def render(self, samplerate: int, channels: int) -> np.ndarray:
+        key = (int(samplerate), channels)
+
+        with self._lock:
+            buffer = self._rendered.get(key)
+
+            if buffer is None:
+                buffer = np.ascontiguousarray(self._remix(self._resample(key[0]), channels))
+                buffer.flags.writeable = False
+                self._rendered[key] = buffer
+
+        return buffer
@@ -0,0 +1,95 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+from loguru import logger
+
+
+class ClipCache:
+    DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, loader: Callable[[str], object], sizer: Callable[[object], int], budget_bytes: int = DEFAULT_BUDGET_BYTES) -> None:
+        self._loader = loader
+        self._sizer = sizer
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path: str) -> object | None:
+        path = os.path.abspath(file_path)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.error(f"Audio file not found: {file_path}")
+            self.invalidate(path)
+            return None
+
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+
+        try:
+            clip = self._loader(path)
+        except Exception as e:
+            logger.error(f"Failed to decode audio file: {e}")
+            return None
+
+        self._store(path, key, clip)
+        return clip
+
+    def _store(self, path: str, key: tuple, clip: object) -> None:
+        size = self._sizer(clip)
+
+        with self._lock:
+            self._remove(path)
+
+            if size > self.budget_bytes:
+                logger.info(f"Audio clip exceeds cache budget, not cached: {path}")
+                return
+
+            while self._entries and self.size_bytes + size > self.budget_bytes:
+                evicted_path, _ = next(iter(self._entries.items()))
+                self._remove(evicted_path)
+                self.evictions += 1
+
+            self._entries[path] = (key, clip, size)
+            self.size_bytes += size
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def invalidate(self, file_path: str) -> None:
+        with self._lock:
+            self._remove(os.path.abspath(file_path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
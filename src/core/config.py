@@ -1,16 +1,109 @@
 from pathlib import Path
+import hashlib
 import json
+import os
+import threading
+import time
 from loguru import logger
+from .metrics import config_write_seconds, config_writes_skipped_total, config_writes_total
+
+class SettingsWriter:
+    def __init__(self, quiet_period: float) -> None:
+        self.quiet_period = quiet_period
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = None
+        self._last_change = 0.0
+        self._thread = None
+
+    def schedule(self, content: str) -> None:
+        with self._condition:
+            self._pending = content
+            self._last_change = time.monotonic()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+                self._thread.start()
+
+            self._condition.notify_all()
+
+    def has_pending(self) -> bool:
+        with self._condition:
+            return self._pending is not None
+
+    def _wait_until_quiet(self) -> bool:
+        with self._condition:
+            while self._pending is not None:
+                remaining = self._last_change + self.quiet_period - time.monotonic()
+
+                if remaining <= 0:
+                    return True
+
+                self._condition.wait(remaining)
+
+            self._thread = None
+            return False
+
+    def _run(self) -> None:
+        while self._wait_until_quiet():
+            self.flush()
+
+    def flush(self) -> None:
+        with self._io_lock:
+            with self._condition:
+                content, self._pending = self._pending, None
+
+            if content is not None:
+                Config.write_settings(content)
 
 class Config:
     SETTINGS_FILE_PATH = Path(__file__).parent.parent.parent / "resources" / "settings.json"
+    IDLE_HISTORY_FILE_PATH = SETTINGS_FILE_PATH.with_name("idle_history.json")
+    JOURNAL_FILE_PATH = SETTINGS_FILE_PATH.with_name("keepalive.journal")
     DEFAULT_AUDIO_PATH = Path(__file__).parent.parent.parent / "resources" / "audio" / "default.mp3"
     DEFAULT_SETTINGS = {
         "devices": [],
         "audio_file_path": str(DEFAULT_AUDIO_PATH),
+        "audio_hash": None,
+        "audio_loudness_dbfs": None,
         "volume": 0.5,
-        "interval": 5
+        "interval": 5,
+        "adaptive_interval": False,
+        "adaptive_safety_margin": 0.25,
+        "adaptive_interval_max": 60,
+        "device_settings": {},
+        "prewarm_lead_seconds": 1.0,
+        "skip_when_active": True,
+        "activity_threshold": 0.001,
+        "audio_source": "file",
+        "signal_type": "tone",
+        "signal_duration": 0.5,
+        "signal_frequency": 440.0,
+        "signal_level": 0.02
     }
+    GLOBAL_ONLY_SETTINGS = ("devices", "device_settings")
+    SETTING_CHECKS = {
+        "volume": (lambda value: 0.0 <= value <= 1.0, "must be between 0 and 1"),
+        "interval": (lambda value: value > 0, "must be positive"),
+        "adaptive_safety_margin": (lambda value: 0.0 <= value < 1.0, "must be at least 0 and below 1"),
+        "adaptive_interval_max": (lambda value: value > 0, "must be positive"),
+        "prewarm_lead_seconds": (lambda value: value >= 0, "must not be negative"),
+        "activity_threshold": (lambda value: value >= 0, "must not be negative"),
+        "audio_source": (lambda value: value in ("file", "generated"), "must be file or generated"),
+        "signal_type": (lambda value: value in ("tone", "noise", "carrier"), "must be tone, noise or carrier"),
+        "signal_duration": (lambda value: value > 0, "must be positive"),
+        "signal_frequency": (lambda value: value > 0, "must be positive"),
+        "signal_level": (lambda value: 0.0 <= value <= 1.0, "must be between 0 and 1")
+    }
+    SAVE_QUIET_PERIOD = 1.0
+
+    _write_lock = threading.Lock()
+    _last_saved_hash = None
+    _writer = SettingsWriter(SAVE_QUIET_PERIOD)
+
+    @staticmethod
+    def _hash(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
     @staticmethod
     def load_settings() -> dict:
@@ -22,7 +115,9 @@ class Config:
 
         try:
             with open(Config.SETTINGS_FILE_PATH, "r") as file:
-                saved_settings = json.load(file)
+                content = file.read()
+                saved_settings = json.loads(content)
+                Config._last_saved_hash = Config._hash(content)
 
                 if saved_settings:
                     settings.update(saved_settings)
@@ -35,13 +130,127 @@ class Config:
         return settings
 
     @staticmethod
-    def save_settings(settings: dict) -> None:
-        Config.SETTINGS_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    def _check_values(values: dict, where: str) -> None:
+        for key, value in values.items():
+            default = Config.DEFAULT_SETTINGS.get(key)
+
+            if default is None:
+                continue
+
+            # JSON has one number type, so an int default also accepts floats and the other way round
+            if isinstance(default, bool):
+                valid = isinstance(value, bool)
+            elif isinstance(default, (int, float)):
+                valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            else:
+                valid = isinstance(value, type(default))
+
+            if not valid:
+                raise ValueError(f"{where}{key} must be {type(default).__name__}, got {type(value).__name__}")
+
+            check = Config.SETTING_CHECKS.get(key)
+
+            if check is not None and not check[0](value):
+                raise ValueError(f"{where}{key} {check[1]}")
+
+    @staticmethod
+    def _check_device_rules(rules: list, where: str) -> None:
+        from .device_matcher import TargetMatcher
+
+        if not all(isinstance(rule, str) for rule in rules):
+            raise ValueError(f"{where} must be a list of names")
 
         try:
-            with open(Config.SETTINGS_FILE_PATH, "w") as file:
-                json.dump(settings, file, indent=4)
+            TargetMatcher.check_rules(rules)
+        except ValueError as e:
+            raise ValueError(f"{where}: {e}") from None
+
+    @staticmethod
+    def validate_settings(saved_settings) -> dict:
+        if not isinstance(saved_settings, dict):
+            raise ValueError("settings must be a JSON object")
+
+        Config._check_values(saved_settings, "")
+        Config._check_device_rules(saved_settings.get("devices", []), "devices")
+        device_settings = saved_settings.get("device_settings", {})
+        Config._check_device_rules(list(device_settings), "device_settings")
+
+        for name, overrides in device_settings.items():
+            if not isinstance(overrides, dict):
+                raise ValueError(f"device_settings[{name!r}] must be an object")
+
+            # Overrides are looked up per key at play time, so a misspelled one would be silently ignored
+            unknown = set(overrides) - set(Config.DEFAULT_SETTINGS).difference(Config.GLOBAL_ONLY_SETTINGS)
+
+            if unknown:
+                raise ValueError(f"device_settings[{name!r}] cannot override {', '.join(sorted(unknown))}")
+
+            Config._check_values(overrides, f"device_settings[{name!r}].")
+
+        settings = Config.DEFAULT_SETTINGS.copy()
+        settings.update(saved_settings)
+
+        return settings
+
+    @staticmethod
+    def diff_settings(old: dict, new: dict) -> dict:
+        return {key: value for key, value in new.items() if key not in old or old[key] != value}
+
+    @staticmethod
+    def write_settings(content: str) -> None:
+        content_hash = Config._hash(content)
+
+        with Config._write_lock:
+            if content_hash == Config._last_saved_hash:
+                config_writes_skipped_total.inc()
+                return
+
+            temp_path = Config.SETTINGS_FILE_PATH.with_name(Config.SETTINGS_FILE_PATH.name + ".tmp")
+
+            try:
+                Config.SETTINGS_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+                with config_write_seconds.time():
+                    with open(temp_path, "w") as file:
+                        file.write(content)
+                        file.flush()
+                        os.fsync(file.fileno())
+
+                    os.replace(temp_path, Config.SETTINGS_FILE_PATH)
+
+                Config._last_saved_hash = content_hash
+                config_writes_total.inc()
                 logger.info("Settings saved successfully")
 
+            except Exception as e:
+                logger.error(f"Failed to save settings: {e}")
+
+    @staticmethod
+    def adopt_saved_content(content_hash: str) -> bool:
+        # Returns False for the file this process last wrote or loaded, so only outside edits count as changes
+        with Config._write_lock:
+            if content_hash == Config._last_saved_hash:
+                return False
+
+            Config._last_saved_hash = content_hash
+            return True
+
+    @staticmethod
+    def has_pending_save() -> bool:
+        return Config._writer.has_pending()
+
+    @staticmethod
+    def schedule_save(settings: dict) -> None:
+        try:
+            Config._writer.schedule(json.dumps(settings, indent=4))
         except Exception as e:
-            logger.error(f"Failed to save settings: {e}")
+            logger.error(f"Failed to schedule settings save: {e}")
+
+    @staticmethod
+    def flush_settings() -> None:
+        Config._writer.flush()
+
+    @staticmethod
+    def save_settings(settings: dict) -> None:
+        Config.schedule_save(settings)
+        Config.flush_settings()
@@ -0,0 +1,137 @@
+import fnmatch
+import re
+from loguru import logger
+from .backends import DeviceInfo
+
+# MME reports endpoint names cut to this many characters
+MME_NAME_LIMIT = 31
+HOSTAPI_PREFERENCE = ("windows wasapi", "windows directsound", "mme", "windows wdm-ks", "pulseaudio", "alsa", "core audio", "jack audio connection kit")
+GLOB_CHARACTERS = set("*?[")
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _hostapi_rank(device: DeviceInfo) -> int:
+    hostapi_name = device.hostapi_name.lower()
+    return HOSTAPI_PREFERENCE.index(hostapi_name) if hostapi_name in HOSTAPI_PREFERENCE else len(HOSTAPI_PREFERENCE)
+
+
+def group_devices(devices: tuple) -> dict:
+    groups = dict()
+    aliases = dict()
+    truncated = dict()
+
+    for device in sorted(devices, key=lambda device: -len(device.name)):
+        alias = normalize_name(device.name)
+        name = alias
+
+        if name not in groups and len(name) == MME_NAME_LIMIT and name in truncated:
+            name = truncated[name]
+
+        groups.setdefault(name, list()).append(device)
+        aliases[alias] = name
+
+        if len(name) > MME_NAME_LIMIT:
+            truncated.setdefault(name[:MME_NAME_LIMIT], name)
+
+    physical = dict()
+
+    for name, endpoints in groups.items():
+        preferred = min(endpoints, key=lambda device: (_hostapi_rank(device), device.index))
+        physical[name] = preferred._replace(name=name)
+
+    return {alias: physical[name] for alias, name in aliases.items()}
+
+
+class TargetMatcher:
+    REGEX_PREFIX = "re:"
+
+    def __init__(self, rules: list) -> None:
+        self.rules = tuple(rules)
+        self._exact = dict()
+        self._prefixes = list()
+        self._substrings = list()
+        self._patterns = list()
+        self._cache = dict()
+        active_rules = dict()
+
+        # Rules that normalize to the same name would only ever report the first one, so they count once
+        for rule in self.rules:
+            key = rule if rule.startswith(self.REGEX_PREFIX) else normalize_name(rule)
+
+            if key not in active_rules and self._compile(rule):
+                active_rules[key] = rule
+
+        self.active_rules = tuple(active_rules.values())
+
+        self._prefix_tuple = tuple(prefix for prefix, _ in self._prefixes)
+
+    @classmethod
+    def check_rules(cls, rules: list) -> None:
+        # Globs always translate to a valid pattern, so only explicit regex rules can be rejected
+        for rule in rules:
+            if rule.startswith(cls.REGEX_PREFIX):
+                try:
+                    re.compile(rule[len(cls.REGEX_PREFIX):], re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"invalid device pattern {rule!r}: {e}") from None
+
+    def _compile(self, rule: str) -> bool:
+        if rule.startswith(self.REGEX_PREFIX):
+            pattern = rule[len(self.REGEX_PREFIX):]
+        else:
+            normalized = normalize_name(rule)
+            body = normalized.strip("*")
+
+            if not GLOB_CHARACTERS.intersection(normalized):
+                self._exact[normalized] = rule
+                return True
+
+            if body and not GLOB_CHARACTERS.intersection(body):
+                if normalized == f"{body}*":
+                    self._prefixes.append((body, rule))
+                    return True
+
+                if normalized == f"*{body}*":
+                    self._substrings.append((body, rule))
+                    return True
+
+            pattern = fnmatch.translate(normalized)
+
+        # Each pattern is compiled on its own: inline flags, group names and backreferences are only valid
+        # within their own pattern, and one bad rule must not take the others down with it
+        try:
+            # Device names are lowercased, so regex rules keep their case (\S is not \s) and ignore it when matching
+            self._patterns.append((re.compile(pattern, re.IGNORECASE), rule))
+            return True
+        except re.error as e:
+            logger.error(f"Invalid device pattern {rule!r}: {e}")
+            return False
+
+    def match(self, name: str) -> str | None:
+        if name in self._cache:
+            return self._cache[name]
+
+        rule = self._match(name)
+        self._cache[name] = rule
+
+        return rule
+
+    def _match(self, name: str) -> str | None:
+        if name in self._exact:
+            return self._exact[name]
+
+        if self._prefix_tuple and name.startswith(self._prefix_tuple):
+            return next(rule for prefix, rule in self._prefixes if name.startswith(prefix))
+
+        for substring, rule in self._substrings:
+            if substring in name:
+                return rule
+
+        for pattern, rule in self._patterns:
+            if pattern.fullmatch(name) is not None:
+                return rule
+
+        return None
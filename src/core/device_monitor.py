@@ -1,113 +1,373 @@
-import sounddevice as sd
+import asyncio
 import threading
+import time
 from pathlib import Path
-from .audio_player import AudioPlayer
+from typing import TYPE_CHECKING
 from loguru import logger
-from queue import Queue
+from .backends import Backends
 from .config import Config
+from .device_matcher import TargetMatcher
+from .device_registry import device_registry, DeviceSnapshot, DeviceDiff
+from .engine import engine
+from .hotplug import hotplug_watcher
+from .idle_learner import IdleTimeoutLearner
+from .journal import journal, JournalEvent
+from .metrics import activity_probe_seconds, activity_skips_total, play_latency_seconds, settings_apply_seconds, skipped_ticks_total
+from .scheduler import DeadlineScheduler
+from .settings_store import SettingsStore, SettingsSnapshot
+
+if TYPE_CHECKING:
+    from .clip import Clip
 
 class DeviceMonitor:
-    def __init__(self, request_queue: Queue, response_queue: Queue) -> None:
-        self._thread = None
-        self._stop_event = threading.Event()
-        self.request_queue = request_queue
-        self.response_queue = response_queue
-        self._current_settings = Config.DEFAULT_SETTINGS.copy()
+    PRESENCE_POLL_SECONDS = 15
+    BATCH_WINDOW_SECONDS = 5
+    RESUME_THRESHOLD_SECONDS = 30
+    LEARNING_POLL_SECONDS = 60
+    STOP_TIMEOUT = 2.0
+
+    def __init__(self, settings_store: SettingsStore, idle_learner: IdleTimeoutLearner | None = None) -> None:
+        self._task = None
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self._scheduler = DeadlineScheduler()
+        self._last_played = dict()
+        self._last_seen = dict()
+        self._connected_since = dict()
+        self._idle_learner = idle_learner or IdleTimeoutLearner(Config.IDLE_HISTORY_FILE_PATH)
+        self._prewarmed = False
+        self._wake_event = None
+        self._settings_store = settings_store
+        self._settings_store.subscribe(self._on_settings_changed)
+        self._current_settings = settings_store.get()
+        self._matcher = TargetMatcher(self._current_settings.get("devices", ()))
+        self._connected_cache = (None, None, list())
+        self._next_poll_at = 0.0
+        device_registry.subscribe(self._on_devices_changed)
+
+    def _wake(self) -> None:
+        # The monitor thread clears the event when it stops, so read it once
+        event = self._wake_event
+
+        if event is not None:
+            engine.call_soon(event.set)
+
+    def _on_settings_changed(self, snapshot: SettingsSnapshot) -> None:
+        self._wake()
+
+    def _on_devices_changed(self, snapshot: DeviceSnapshot, diff: DeviceDiff) -> None:
+        self._reset_polling()
+
+        if diff.added:
+            self._wake()
+
+    def _reset_polling(self) -> None:
+        self._next_poll_at = 0.0
 
     def _update_settings(self) -> None:
-        self.request_queue.put("GET_SETTINGS")
-        logger.info("Waiting for settings...")
+        snapshot = self._settings_store.get()
 
-        try:
-            self._current_settings.update(self.response_queue.get(timeout=5))
-            logger.info("Settings received successfully")
-        except Exception as e:
-            logger.error(f"Failed to get settings: {e}")
+        if snapshot.version != self._current_settings.version:
+            if snapshot.get("devices") != self._current_settings.get("devices"):
+                self._matcher = TargetMatcher(snapshot.get("devices", ()))
+
+            self._current_settings = snapshot
+
+            if snapshot.published_at:
+                settings_apply_seconds.observe(time.monotonic() - snapshot.published_at)
+
+            logger.info(f"Settings version {snapshot.version} applied")
+
+    async def _wait(self, seconds: float) -> None:
+        started = Backends.clock.time()
+        await Backends.clock.wait(self._wake_event, seconds)
+        self._wake_event.clear()
+
+        # A wait that overran by far more than requested means the machine was asleep
+        if Backends.clock.time() - started > seconds + self.RESUME_THRESHOLD_SECONDS:
+            logger.info("Resume from sleep detected, rescanning devices")
+            device_registry.invalidate()
+            self._reset_polling()
+
+    def _poll_devices(self, now: float, deadline_due: bool) -> DeviceSnapshot:
+        # With hot-plug events the cached snapshot is current, so nothing is enumerated while the device set is stable
+        if hotplug_watcher.is_active() or (not deadline_due and now < self._next_poll_at):
+            return device_registry.get_snapshot(max_age=self.LEARNING_POLL_SECONDS if self._needs_presence_samples() else float("inf"))
+
+        snapshot = device_registry.get_snapshot()
+
+        # Without an event source a new headset is only seen by polling, so the cadence cannot back off without
+        # making detection slower
+        if now >= self._next_poll_at:
+            self._next_poll_at = now + self.PRESENCE_POLL_SECONDS
+
+        return snapshot
 
     def get_output_devices(self) -> list:
-        try:
-            devices = sd.query_devices()
-            output_devices = list()
+        return device_registry.get_snapshot().physical_names
+
+    def _get_connected_targets(self, snapshot: DeviceSnapshot) -> list:
+        matcher, snapshot_version, connected_targets = self._connected_cache
 
-            for device in devices:
-                if device["max_output_channels"] > 0:
-                    output_devices.append(device["name"].lower().strip())
+        if matcher is self._matcher and snapshot_version == snapshot.version:
+            return connected_targets
 
-            return output_devices
+        matched = {device.name: device for alias, device in snapshot.physical_by_alias.items() if self._matcher.match(alias) is not None}
+        connected_targets = list(matched.values())
+        self._connected_cache = (self._matcher, snapshot.version, connected_targets)
 
-        except Exception as e:
-            logger.error(f"Failed to get output devices: {e}")
-            return []
+        return connected_targets
 
-    def _is_target_device_connected(self) -> bool:
-        connected_devices = self.get_output_devices()
+    def _has_missing_targets(self, snapshot: DeviceSnapshot) -> bool:
+        matched_rules = {self._matcher.match(alias) for alias in snapshot.physical_by_alias}
+        matched_rules.discard(None)
 
-        for target_device in self._current_settings["devices"]:
-            for connected_device in connected_devices:
-                if target_device == connected_device:
-                    return True
+        return len(matched_rules) < len(self._matcher.active_rules)
 
-        return False
+    def _load_clip(self) -> "Clip | None":
+        from .audio_player import AudioPlayer
+        from .signal_generator import SignalGenerator
 
-    def _loop(self) -> None:
-        while not self._stop_event.is_set():
+        settings = self._current_settings
+        defaults = Config.DEFAULT_SETTINGS
+
+        if settings.get("audio_source", defaults["audio_source"]) == "generated":
             try:
-                self._update_settings()
+                return SignalGenerator.get_clip(
+                    settings.get("signal_type", defaults["signal_type"]),
+                    settings.get("signal_duration", defaults["signal_duration"]),
+                    settings.get("signal_frequency", defaults["signal_frequency"]),
+                    settings.get("signal_level", defaults["signal_level"])
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate signal: {e}")
+                return None
 
-                target_devices = self._current_settings.get("devices", Config.DEFAULT_SETTINGS["devices"])
-                audio_file_path =self._current_settings.get("audio_file_path", Config.DEFAULT_SETTINGS["audio_file_path"])
-                volume = self._current_settings.get("volume", Config.DEFAULT_SETTINGS["volume"])
-                interval = self._current_settings.get("interval", Config.DEFAULT_SETTINGS["interval"])
-                interval_seconds = interval * 60
+        audio_file_path = settings.get("audio_file_path", defaults["audio_file_path"])
 
-                if not target_devices:
-                    if self._stop_event.wait(15):
-                        break
+        if not Path(audio_file_path).exists():
+            return None
 
-                    continue
+        return AudioPlayer.load_clip(audio_file_path)
 
-                if not Path(audio_file_path).exists():
-                    if self._stop_event.wait(15):
-                        break
+    def _device_setting(self, name: str, key: str):
+        device_settings = self._current_settings.get("device_settings", {})
+        overrides = device_settings.get(name) or device_settings.get(self._matcher.match(name), {})
+        return overrides.get(key, self._current_settings.get(key, Config.DEFAULT_SETTINGS[key]))
 
-                    continue
+    def _interval_seconds(self, name: str) -> float:
+        configured = self._device_setting(name, "interval") * 60
 
-                if self._is_target_device_connected():
-                    AudioPlayer.play_audio(audio_file_path, volume)
+        if not self._device_setting(name, "adaptive_interval"):
+            return configured
 
-                    if self._stop_event.wait(interval_seconds):
-                        break
-                else:
-                    if self._stop_event.wait(15):
-                        break
+        return self._idle_learner.interval_seconds(
+            name,
+            configured,
+            self._device_setting(name, "adaptive_safety_margin"),
+            self._device_setting(name, "adaptive_interval_max") * 60
+        )
 
-            except Exception as e:
-                logger.error(f"Failed to monitor devices: {e}")
+    def _needs_presence_samples(self) -> bool:
+        if hotplug_watcher.is_active():
+            return False
+
+        # Learning idle timeouts needs to see a device vanish between keep-alives, which deadline-only polling would miss
+        device_settings = self._current_settings.get("device_settings", {})
+        return bool(self._current_settings.get("adaptive_interval")) or any(overrides.get("adaptive_interval") for overrides in device_settings.values())
+
+    def _track_presence(self, connected_targets: dict, seen_at: float) -> None:
+        for name in list(self._last_seen):
+            if name not in connected_targets:
+                # The last time the device was seen is the conservative end of its silence
+                last_seen = self._last_seen.pop(name)
+                self._idle_learner.record_disconnect(name, last_seen)
+                self._connected_since.pop(name, None)
+                journal.append(JournalEvent.DISCONNECT, name, timestamp=last_seen)
+
+        for name in connected_targets:
+            if name not in self._last_seen:
+                journal.append(JournalEvent.CONNECT, name, timestamp=seen_at)
+
+            self._last_seen[name] = seen_at
+            self._connected_since.setdefault(name, seen_at)
+
+    def _sync_schedule(self, connected_targets: dict, now: float) -> None:
+        for name in self._scheduler.keys():
+            if name not in connected_targets:
+                self._scheduler.remove(name)
+
+        for name in list(self._last_played):
+            if name not in connected_targets:
+                del self._last_played[name]
+
+        for name in connected_targets:
+            last_played = self._last_played.get(name)
+            self._scheduler.schedule(name, now if last_played is None else last_played + self._interval_seconds(name))
+
+    def _is_carrying_audio(self, name: str, device) -> bool:
+        if not self._device_setting(name, "skip_when_active"):
+            return False
+
+        with activity_probe_seconds.time():
+            return Backends.activity.is_active(device, self._device_setting(name, "activity_threshold")) is True
+
+    def _play_due(self, clip: "Clip", connected_targets: dict, now: float) -> None:
+        from .audio_player import AudioPlayer
+
+        started = time.perf_counter()
+        due = list()
+        skipped = list()
 
-                if self._stop_event.wait(15):
-                    break
+        for name, deadline in self._scheduler.pop_due(now, self.BATCH_WINDOW_SECONDS):
+            # Audio already flowing keeps the device awake, so the next tick is counted from now
+            if self._is_carrying_audio(name, connected_targets[name]):
+                self._last_played[name] = now
+                skipped.append(name)
+                skipped_ticks_total.inc()
+                activity_skips_total.inc()
+                journal.append(JournalEvent.SKIP_ACTIVE, name)
+            else:
+                due.append((name, deadline))
 
-        logger.info("Device monitoring stopped")
-        self._thread = None
+        for _, deadline in due:
+            play_latency_seconds.observe(max(0.0, now - deadline))
+
+        AudioPlayer.play_batch(clip, [(connected_targets[name], self._device_setting(name, "volume")) for name, _ in due])
+
+        for name, deadline in due:
+            on_schedule = now - deadline < self._interval_seconds(name)
+            self._last_played[name] = deadline if on_schedule else now
+
+        played_at = Backends.clock.time()
+
+        for name in skipped + [name for name, _ in due]:
+            self._idle_learner.record_keepalive(name, played_at, self._connected_since.get(name))
+
+        journal.append(JournalEvent.TICK, duration=time.perf_counter() - started, timestamp=played_at)
+
+    def _prewarm_or_wait(self, connected_targets: dict, next_deadline: float, now: float) -> float:
+        lead = self._current_settings.get("prewarm_lead_seconds", Config.DEFAULT_SETTINGS["prewarm_lead_seconds"])
+        prewarm_at = next_deadline - lead
+
+        if now < prewarm_at:
+            return prewarm_at - now
+
+        from .audio_player import AudioPlayer
+
+        batch_end = next_deadline + self.BATCH_WINDOW_SECONDS
+        self._prewarmed = True
+        AudioPlayer.prewarm([device for name, device in connected_targets.items() if self._scheduler.deadline(name) <= batch_end])
+
+        return max(0.0, next_deadline - Backends.clock.monotonic())
+
+    def _release_outputs(self) -> None:
+        if not self._prewarmed:
+            return
+
+        from .audio_player import AudioPlayer
+
+        AudioPlayer.release_outputs()
+        self._prewarmed = False
+
+    def _prepare_tick(self) -> tuple:
+        now = Backends.clock.monotonic()
+        next_deadline = self._scheduler.next_deadline()
+        snapshot = self._poll_devices(now, next_deadline is not None and next_deadline <= now)
+        connected_targets = {device.name: device for device in self._get_connected_targets(snapshot)}
+        seen_at = Backends.clock.time()
+
+        if not hotplug_watcher.is_active():
+            seen_at -= now - snapshot.timestamp
+
+        self._track_presence(connected_targets, seen_at)
+        self._sync_schedule(connected_targets, now)
+
+        return now, snapshot, connected_targets
+
+    async def _tick(self) -> None:
+        self._update_settings()
+
+        if not self._current_settings.get("devices", Config.DEFAULT_SETTINGS["devices"]):
+            self._scheduler.clear()
+            await self._wait(self.PRESENCE_POLL_SECONDS)
+            return
+
+        now, snapshot, connected_targets = await engine.run_blocking(self._prepare_tick)
+        next_deadline = self._scheduler.next_deadline()
+
+        if next_deadline is not None and next_deadline <= now:
+            clip = await engine.run_blocking(self._load_clip)
+
+            if clip is None:
+                skipped_ticks_total.inc()
+                await self._wait(self.PRESENCE_POLL_SECONDS)
+                return
+
+            await engine.run_blocking(self._play_due, clip, connected_targets, now)
+            self._sync_schedule(connected_targets, now)
+            next_deadline = self._scheduler.next_deadline()
+
+        now = Backends.clock.monotonic()
+        timeout = self.PRESENCE_POLL_SECONDS if next_deadline is None else await engine.run_blocking(self._prewarm_or_wait, connected_targets, next_deadline, now)
+
+        if self._has_missing_targets(snapshot) and not hotplug_watcher.is_active():
+            timeout = min(timeout, max(0.0, self._next_poll_at - now))
+
+        if self._needs_presence_samples():
+            timeout = min(timeout, self.LEARNING_POLL_SECONDS)
+
+        await self._wait(timeout)
+
+    async def _run(self, stopped: threading.Event) -> None:
+        self._wake_event = asyncio.Event()
+        await engine.run_blocking(journal.append, JournalEvent.MONITOR_START)
+
+        try:
+            while True:
+                try:
+                    await self._tick()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to monitor devices: {e}")
+                    await self._wait(15)
+        finally:
+            self._wake_event = None
+            await engine.run_blocking(self._release_outputs)
+            await engine.run_blocking(self._idle_learner.save)
+            await engine.run_blocking(journal.append, JournalEvent.MONITOR_STOP)
+            stopped.set()
+            logger.info("Device monitoring stopped")
 
     def start(self) -> None:
         if self.is_running():
             logger.info("Device monitoring is already running")
             return
 
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._loop)
-        self._thread.start()
+        self._scheduler.clear()
+        self._last_played.clear()
+        self._last_seen.clear()
+        self._connected_since.clear()
+        self._reset_polling()
+        self._stopped = threading.Event()
+        self._task = engine.submit(self._run(self._stopped))
+        hotplug_watcher.start()
 
         logger.info("Device monitoring started")
 
-    def stop(self) -> None:
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
         if not self.is_running():
             logger.info("Device monitoring is not running")
             return
 
-        self._stop_event.set()
-        logger.info("Device monitoring stopped")
+        # Cancellation lands at the next await, so stopping never waits for a tick or a poll interval
+        self._task.cancel()
+        self.join(timeout)
+
+    def join(self, timeout: float | None = None) -> None:
+        if not engine.in_engine_thread():
+            self._stopped.wait(timeout)
 
     def is_running(self) -> bool:
-        return self._thread is not None and self._thread.is_alive()
+        return not self._stopped.is_set() and engine.is_running()
@@ -0,0 +1,145 @@
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable
+from loguru import logger
+from .backends import Backends
+from .device_matcher import group_devices
+from .metrics import enumeration_seconds
+
+
+@dataclass(frozen=True)
+class DeviceSnapshot:
+    version: int
+    devices: tuple = ()
+    timestamp: float = 0.0
+
+    @property
+    def names(self) -> list:
+        return [device.name for device in self.devices]
+
+    @cached_property
+    def physical_by_alias(self) -> dict:
+        return group_devices(self.devices)
+
+    @cached_property
+    def physical_devices(self) -> tuple:
+        physical = {device.name: device for device in self.physical_by_alias.values()}
+        return tuple(sorted(physical.values(), key=lambda device: device.index))
+
+    @property
+    def physical_names(self) -> list:
+        return [device.name for device in self.physical_devices]
+
+
+@dataclass(frozen=True)
+class DeviceDiff:
+    added: frozenset = frozenset()
+    removed: frozenset = frozenset()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+class DeviceRegistry:
+    DEFAULT_TTL = 10.0
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._enumerate_lock = threading.Lock()
+        self._subscribers = list()
+        self._snapshot = DeviceSnapshot(0)
+        self._valid = False
+
+    @staticmethod
+    def diff(old: DeviceSnapshot, new: DeviceSnapshot) -> DeviceDiff:
+        old_names = set(old.names)
+        new_names = set(new.names)
+
+        return DeviceDiff(frozenset(new_names - old_names), frozenset(old_names - new_names))
+
+    def _is_fresh(self, max_age: float) -> bool:
+        return self._valid and Backends.clock.monotonic() - self._snapshot.timestamp < max_age
+
+    def get_snapshot(self, max_age: float | None = None) -> DeviceSnapshot:
+        max_age = self.ttl if max_age is None else max_age
+
+        if self._is_fresh(max_age):
+            return self._snapshot
+
+        with self._enumerate_lock:
+            if self._is_fresh(max_age):
+                return self._snapshot
+
+            return self._enumerate()
+
+    def refresh(self, rescan: bool = False) -> DeviceSnapshot:
+        if not rescan:
+            return self.get_snapshot(max_age=0)
+
+        with self._enumerate_lock:
+            try:
+                rescanned = Backends.devices.rescan()
+            except Exception as e:
+                logger.error(f"Failed to rescan output devices: {e}")
+                rescanned = False
+
+            snapshot = self._enumerate()
+
+            # A deferred rescan still lists the old devices, so the next lookup has to enumerate again
+            if not rescanned:
+                self._valid = False
+
+            return snapshot
+
+    def invalidate(self) -> None:
+        self._valid = False
+
+    def _enumerate(self) -> DeviceSnapshot:
+        try:
+            with enumeration_seconds.time():
+                devices = Backends.devices.query_output_devices()
+        except Exception as e:
+            logger.error(f"Failed to get output devices: {e}")
+            return self._snapshot
+
+        with self._lock:
+            previous = self._snapshot
+            changed = devices != previous.devices
+            snapshot = DeviceSnapshot(previous.version + 1 if changed else previous.version, devices, Backends.clock.monotonic())
+            self._snapshot = snapshot
+            self._valid = True
+            subscribers = list(self._subscribers)
+
+        if changed:
+            diff = self.diff(previous, snapshot)
+            logger.info(f"Output devices changed: {len(diff.added)} added, {len(diff.removed)} removed")
+
+            for callback in subscribers:
+                self._notify(callback, snapshot, diff)
+
+        return snapshot
+
+    @staticmethod
+    def _notify(callback: Callable, snapshot: DeviceSnapshot, diff: DeviceDiff) -> None:
+        try:
+            callback(snapshot, diff)
+        except Exception as e:
+            logger.error(f"Failed to notify device subscriber: {e}")
+
+    def subscribe(self, callback: Callable[[DeviceSnapshot, DeviceDiff], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+            snapshot = self._snapshot
+
+        if snapshot.version:
+            self._notify(callback, snapshot, self.diff(DeviceSnapshot(0), snapshot))
+
+    def unsubscribe(self, callback: Callable[[DeviceSnapshot, DeviceDiff], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+
+device_registry = DeviceRegistry()
@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Coroutine
+from loguru import logger
+
+
+class Engine:
+    BLOCKING_WORKERS = 2
+    STOP_TIMEOUT = 2.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_engine_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def start(self) -> None:
+        with self._lock:
+            if self.is_running():
+                return
+
+            ready = threading.Event()
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.BLOCKING_WORKERS, thread_name_prefix="keepalive-blocking")
+            self._thread = threading.Thread(target=self._run, args=(self._loop, ready), name="keepalive-engine", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+        logger.info("Engine started")
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop, ready: threading.Event) -> None:
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        loop.close()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def call_soon(self, callback: Callable, *args) -> None:
+        loop = self._loop
+
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(callback, *args)
+
+    async def run_blocking(self, function: Callable, *args):
+        # PortAudio, SDL and file I/O never run on the loop itself, and never more than BLOCKING_WORKERS at once
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(function, *args))
+
+    async def _cancel_all(self) -> None:
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        with self._lock:
+            if not self.is_running():
+                return
+
+            loop, thread, executor = self._loop, self._thread, self._executor
+
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout)
+            except Exception as e:
+                logger.error(f"Engine tasks did not stop in time: {e}")
+
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+
+            # Calls stuck in a driver are abandoned rather than waited for
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._thread = None
+            self._loop = None
+            self._executor = None
+
+        logger.info("Engine stopped")
+
+
+engine = Engine()
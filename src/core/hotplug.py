@@ -0,0 +1,124 @@
+import asyncio
+import re
+import shutil
+import sys
+from loguru import logger
+from .device_registry import device_registry
+from .engine import engine
+from .metrics import hotplug_events_total
+
+
+class HotplugWatcher:
+    COMMAND = ("pactl", "subscribe")
+    EVENT_PATTERN = re.compile(r"Event '(new|remove)' on (sink|card) #(\d+)")
+    DEBOUNCE_SECONDS = 0.2
+    RETRY_SECONDS = 30.0
+
+    def __init__(self, command: tuple | None = None) -> None:
+        self.command = command
+        self._future = None
+        self._active = False
+        self._dirty = False
+
+    def _resolve_command(self) -> tuple | None:
+        # An empty command turns the watcher off
+        if self.command is not None:
+            return self.command or None
+
+        # pactl talks to PulseAudio and to PipeWire's pipewire-pulse alike
+        if sys.platform.startswith("linux") and shutil.which(self.COMMAND[0]):
+            return self.COMMAND
+
+        return None
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def is_running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+
+        command = self._resolve_command()
+
+        if command is None:
+            logger.info("No hot-plug event source available, using polling")
+            return
+
+        self._future = engine.submit(self._run(command))
+
+    def stop(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+        self._active = False
+
+    async def _run(self, command: tuple) -> None:
+        while True:
+            try:
+                process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+            except OSError as e:
+                logger.error(f"Failed to start hot-plug event source {command[0]}: {e}")
+                await asyncio.sleep(self.RETRY_SECONDS)
+                continue
+
+            try:
+                # Anything that happened before the subscription was in place is caught by one fresh enumeration
+                await self._refresh()
+                self._active = True
+                logger.info(f"Listening for hot-plug events from {' '.join(command)}")
+
+                await self._read_events(process.stdout)
+            finally:
+                self._active = False
+
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+            logger.error(f"Hot-plug event source exited, falling back to polling for {self.RETRY_SECONDS:.0f} s")
+            device_registry.invalidate()
+            await asyncio.sleep(self.RETRY_SECONDS)
+
+    async def _read_events(self, stream: asyncio.StreamReader) -> None:
+        pending = None
+
+        while True:
+            line = await stream.readline()
+
+            if not line:
+                break
+
+            found = self.EVENT_PATTERN.search(line.decode("utf-8", "replace"))
+
+            if found is None:
+                continue
+
+            hotplug_events_total.inc()
+            logger.debug(f"Hot-plug event: {found.group(1)} {found.group(2)} #{found.group(3)}")
+
+            # A Bluetooth connect fires card and sink events in a burst, so they share one enumeration
+            self._dirty = True
+
+            if pending is None or pending.done():
+                pending = asyncio.ensure_future(self._refresh_while_dirty())
+
+        if pending is not None:
+            pending.cancel()
+
+    async def _refresh_while_dirty(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(self.DEBOUNCE_SECONDS)
+            self._dirty = False
+            await self._refresh()
+
+    @staticmethod
+    async def _refresh() -> None:
+        # The audio library keeps the device list it saw at startup, so each event makes it look again
+        await engine.run_blocking(device_registry.refresh, True)
+
+
+hotplug_watcher = HotplugWatcher()
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+from pathlib import Path
+from loguru import logger
+
+
+class IdleTimeoutLearner:
+    MAX_GAPS = 50
+    MAX_GAP_SECONDS = 6 * 3600
+    MIN_INTERVAL_SECONDS = 60.0
+    PROBE_GROWTH = 1.25
+    CLUSTER_TOLERANCE = 0.2
+    MIN_CLUSTER = 2
+    SAVE_PERIOD_SECONDS = 300.0
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._devices = dict()
+        self._saved_at = None
+        self._load()
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r") as file:
+                self._devices = {name: dict(history) for name, history in json.load(file).items()}
+
+            logger.info(f"Idle history loaded for {len(self._devices)} devices")
+        except Exception as e:
+            logger.error(f"Failed to load idle history: {e}")
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        with self._lock:
+            content = json.dumps(self._devices, indent=4)
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, "w") as file:
+                file.write(content)
+
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save idle history: {e}")
+
+    def _history(self, name: str) -> dict:
+        return self._devices.setdefault(name, {"last_keepalive": None, "survived": 0.0, "gaps": []})
+
+    def record_keepalive(self, name: str, when: float, connected_since: float | None) -> None:
+        with self._lock:
+            history = self._history(name)
+            last_keepalive = history["last_keepalive"]
+
+            # The device stayed connected through the whole silence, so the idle timeout is longer than that
+            if last_keepalive is not None and connected_since is not None and connected_since <= last_keepalive:
+                history["survived"] = max(history["survived"], when - last_keepalive)
+
+            history["last_keepalive"] = when
+            due_save = self._saved_at is None or when - self._saved_at >= self.SAVE_PERIOD_SECONDS
+
+        if due_save:
+            self._saved_at = when
+            self.save()
+
+    def record_disconnect(self, name: str, last_seen: float) -> None:
+        with self._lock:
+            history = self._history(name)
+            last_keepalive = history["last_keepalive"]
+
+            if last_keepalive is None or not 0 <= last_seen - last_keepalive <= self.MAX_GAP_SECONDS:
+                return
+
+            history["gaps"] = (history["gaps"] + [last_seen - last_keepalive])[-self.MAX_GAPS:]
+
+        self.save()
+
+    def _suspects(self, name: str) -> list:
+        with self._lock:
+            history = self._devices.get(name)
+
+            if history is None:
+                return []
+
+            # Disconnects sooner than a silence the device already survived were the user, not the idle timer
+            return sorted(gap for gap in history["gaps"] if gap >= history["survived"])
+
+    def estimate(self, name: str) -> float | None:
+        suspects = self._suspects(name)
+
+        # An idle timer fires at the same silence every time, while the user switches off at random
+        for index, gap in enumerate(suspects):
+            if len([other for other in suspects[index:] if other <= gap * (1 + self.CLUSTER_TOLERANCE)]) >= self.MIN_CLUSTER:
+                return gap
+
+        return None
+
+    def interval_seconds(self, name: str, configured: float, margin: float, maximum: float) -> float:
+        estimate = self.estimate(name)
+
+        if estimate is not None:
+            interval = estimate * (1 - margin)
+        else:
+            suspects = self._suspects(name)
+
+            with self._lock:
+                survived = self._devices.get(name, {}).get("survived", 0.0)
+
+            # Stretch a little past the longest silence the device is known to survive, but stop short of any
+            # disconnect that might have been the idle timer; a single such disconnect never shortens the interval
+            interval = max(configured, survived * self.PROBE_GROWTH)
+
+            if suspects:
+                interval = min(interval, max(configured, suspects[0] * (1 - margin)))
+
+        return max(self.MIN_INTERVAL_SECONDS, min(interval, max(maximum, configured)))
@@ -0,0 +1,222 @@
+import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import Counter
+from enum import IntEnum
+from pathlib import Path
+from typing import NamedTuple
+from loguru import logger
+from .backends import Backends
+from .config import Config
+
+
+class JournalEvent(IntEnum):
+    MONITOR_START = 1
+    MONITOR_STOP = 2
+    CONNECT = 3
+    DISCONNECT = 4
+    PLAY = 5
+    PLAY_FAILED = 6
+    SKIP_ACTIVE = 7
+    TICK = 8
+
+
+class JournalRecord(NamedTuple):
+    timestamp: float
+    device: str | None
+    event: JournalEvent
+    duration: float
+
+
+class Journal:
+    MAGIC = b"KAJ1"
+    HEADER = struct.Struct("<4sIQQ8x")
+    RECORD = struct.Struct("<dIHxxf")
+    DEFAULT_CAPACITY = 262144
+    NO_DEVICE = 0
+
+    def __init__(self, path: Path | None, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._next = 0
+        self._count = 0
+        self._names = dict()
+
+    @property
+    def _names_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".devices.json")
+
+    @staticmethod
+    def device_id(name: str | None) -> int:
+        # A stable id keeps records meaningful even if the names file is lost; 0 is reserved for "no device"
+        return Journal.NO_DEVICE if name is None else zlib.crc32(name.encode("utf-8")) or 1
+
+    def _load_names(self) -> dict:
+        try:
+            with open(self._names_path, "r") as file:
+                return {int(device_id): name for device_id, name in json.load(file).items()}
+        except FileNotFoundError:
+            return dict()
+
+    def _save_names(self) -> None:
+        temp_path = self._names_path.with_name(self._names_path.name + ".tmp")
+
+        with open(temp_path, "w") as file:
+            json.dump({str(device_id): name for device_id, name in self._names.items()}, file, indent=4)
+
+        os.replace(temp_path, self._names_path)
+
+    def _open(self) -> bool:
+        if self._map is not None:
+            return True
+
+        if self.path is None:
+            return False
+
+        size = self.HEADER.size + self.capacity * self.RECORD.size
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "r+b" if self.path.exists() else "w+b")
+        header = self._file.read(self.HEADER.size)
+
+        if len(header) == self.HEADER.size and header[:4] == self.MAGIC:
+            _, self.capacity, self._next, self._count = self.HEADER.unpack(header)
+            size = self.HEADER.size + self.capacity * self.RECORD.size
+        else:
+            self._file.truncate(0)
+            self._next = 0
+            self._count = 0
+
+        if os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._names = self._load_names()
+        self._write_header()
+
+        return True
+
+    def _write_header(self) -> None:
+        self.HEADER.pack_into(self._map, 0, self.MAGIC, self.capacity, self._next, self._count)
+
+    def append(self, event: JournalEvent, device: str | None = None, duration: float = 0.0, timestamp: float | None = None) -> None:
+        timestamp = Backends.clock.time() if timestamp is None else timestamp
+
+        try:
+            with self._lock:
+                if not self._open():
+                    return
+
+                device_id = self.device_id(device)
+
+                if device is not None and self._names.get(device_id) != device:
+                    self._names[device_id] = device
+                    self._save_names()
+
+                self.RECORD.pack_into(self._map, self.HEADER.size + self._next * self.RECORD.size, timestamp, device_id, int(event), duration)
+                self._next = (self._next + 1) % self.capacity
+                self._count = min(self._count + 1, self.capacity)
+                self._write_header()
+        except Exception as e:
+            logger.error(f"Failed to append to journal: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._file.close()
+                self._map = None
+                self._file = None
+
+    def _read(self) -> tuple:
+        if self._map is not None:
+            return bytes(self._map), self._names
+
+        with open(self.path, "rb") as file:
+            return file.read(), self._load_names()
+
+    def records(self, since: float | None = None, until: float | None = None, device: str | None = None, event: JournalEvent | None = None) -> list:
+        if self.path is None or not self.path.exists():
+            return []
+
+        with self._lock:
+            data, names = self._read()
+
+        magic, capacity, next_index, count = self.HEADER.unpack_from(data, 0)
+
+        if magic != self.MAGIC:
+            return []
+
+        body = memoryview(data)[self.HEADER.size:self.HEADER.size + capacity * self.RECORD.size]
+        oldest = (next_index - count) % capacity
+        # The ring is stored oldest-first from `oldest`, so two contiguous slices put it back in order
+        ordered = bytes(body[oldest * self.RECORD.size:]) + bytes(body[:oldest * self.RECORD.size]) if count == capacity else bytes(body[:count * self.RECORD.size])
+        device_filter = None if device is None else self.device_id(device)
+        results = list()
+
+        for timestamp, device_id, event_type, duration in self.RECORD.iter_unpack(ordered):
+            if since is not None and timestamp < since:
+                continue
+
+            if until is not None and timestamp >= until:
+                continue
+
+            if device_filter is not None and device_id != device_filter:
+                continue
+
+            if event is not None and event_type != event:
+                continue
+
+            name = None if device_id == self.NO_DEVICE else names.get(device_id, f"#{device_id:08x}")
+            results.append(JournalRecord(timestamp, name, JournalEvent(event_type), duration))
+
+        return results
+
+    def summarize(self, since: float | None = None) -> dict:
+        uptime = 0.0
+        started = None
+        last_timestamp = None
+        plays = Counter()
+        failures = Counter()
+        disconnects = dict()
+
+        for record in self.records(since=since):
+            if record.event == JournalEvent.MONITOR_START:
+                # A start without a stop means the process died; its last record is the best end we have
+                if started is not None:
+                    uptime += last_timestamp - started
+
+                started = record.timestamp
+            elif record.event == JournalEvent.MONITOR_STOP and started is not None:
+                uptime += record.timestamp - started
+                started = None
+            elif record.event == JournalEvent.PLAY:
+                plays[record.device] += 1
+            elif record.event == JournalEvent.PLAY_FAILED:
+                failures[record.device] += 1
+            elif record.event == JournalEvent.DISCONNECT:
+                day = datetime.date.fromtimestamp(record.timestamp).isoformat()
+                disconnects.setdefault(day, Counter())[record.device] += 1
+
+            last_timestamp = record.timestamp
+
+        # A running monitor journals every keep-alive tick, so its last record is recent
+        if started is not None:
+            uptime += last_timestamp - started
+
+        return {
+            "uptime_hours": uptime / 3600,
+            "plays": dict(plays),
+            "play_failures": dict(failures),
+            "disconnects_per_day": {day: dict(counts) for day, counts in sorted(disconnects.items())}
+        }
+
+
+journal = Journal(Config.JOURNAL_FILE_PATH)
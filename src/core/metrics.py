@@ -0,0 +1,173 @@
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from loguru import logger
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> dict:
+        return {"type": "counter", "value": self.value}
+
+    def to_prometheus(self) -> list:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}"
+        ]
+
+
+class Histogram:
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.last = None
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.last = value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "type": "histogram",
+                "count": self.count,
+                "sum": self.sum,
+                "last": self.last,
+                "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self._cumulative()))
+            }
+
+    def _cumulative(self) -> list:
+        cumulative = list()
+        total = 0
+
+        for bucket_count in self._bucket_counts:
+            total += bucket_count
+            cumulative.append(total)
+
+        return cumulative
+
+    def to_prometheus(self) -> list:
+        with self._lock:
+            lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+
+            for bound, total in zip([str(bound) for bound in self.buckets] + ["+Inf"], self._cumulative()):
+                lines.append(f'{self.name}_bucket{{le="{bound}"}} {total}')
+
+            lines.append(f"{self.name}_sum {self.sum}")
+            lines.append(f"{self.name}_count {self.count}")
+
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics = dict()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help_text, buckets))
+
+    def _register(self, name: str, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+
+            return self._metrics[name]
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return "\n".join(line for metric in metrics for line in metric.to_prometheus()) + "\n"
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        temp_path = path.with_name(path.name + ".tmp")
+
+        with open(temp_path, "w") as file:
+            file.write(content)
+
+        os.replace(temp_path, path)
+
+    def export(self, directory: Path) -> bool:
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(directory / "keepalive.prom", self.to_prometheus())
+            self._write_atomic(directory / "keepalive_metrics.json", json.dumps(self.snapshot(), indent=4))
+
+            logger.info(f"Metrics exported to {directory}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to export metrics: {e}")
+            return False
+
+
+metrics = MetricsRegistry()
+
+enumeration_seconds = metrics.histogram("keepalive_enumeration_seconds", "Duration of output device enumeration")
+play_latency_seconds = metrics.histogram("keepalive_play_latency_seconds", "Delay between a keep-alive deadline and the start of playback")
+play_seconds = metrics.histogram("keepalive_play_seconds", "Duration of playback on one device, including stream open")
+plays_total = metrics.counter("keepalive_plays_total", "Keep-alive clips played")
+play_failures_total = metrics.counter("keepalive_play_failures_total", "Keep-alive plays that failed")
+skipped_ticks_total = metrics.counter("keepalive_skipped_ticks_total", "Keep-alive ticks that were due but not played")
+activity_skips_total = metrics.counter("keepalive_activity_skips_total", "Keep-alive ticks skipped because the device was already carrying audio")
+activity_probe_seconds = metrics.histogram("keepalive_activity_probe_seconds", "Duration of one device activity probe")
+audio_worker_restarts_total = metrics.counter("keepalive_audio_worker_restarts_total", "Audio worker processes replaced after a hung or crashed driver call")
+hotplug_events_total = metrics.counter("keepalive_hotplug_events_total", "Sink and card add or remove events received from the sound server")
+settings_reloads_total = metrics.counter("keepalive_settings_reloads_total", "External edits to the settings file applied without a restart")
+settings_reloads_rejected_total = metrics.counter("keepalive_settings_reloads_rejected_total", "External edits to the settings file ignored because they failed validation")
+settings_apply_seconds = metrics.histogram("keepalive_settings_apply_seconds", "Delay between publishing settings and the monitor applying them")
+config_writes_total = metrics.counter("keepalive_config_writes_total", "Settings file writes")
+config_writes_skipped_total = metrics.counter("keepalive_config_writes_skipped_total", "Settings file writes skipped because the content was unchanged")
+config_write_seconds = metrics.histogram("keepalive_config_write_seconds", "Duration of a settings file write")
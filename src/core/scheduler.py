@@ -0,0 +1,59 @@
+import heapq
+import itertools
+from typing import Hashable
+
+
+class DeadlineScheduler:
+    def __init__(self) -> None:
+        self._heap = list()
+        self._deadlines = dict()
+        self._counter = itertools.count()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def keys(self) -> list:
+        return list(self._deadlines)
+
+    def deadline(self, key: Hashable) -> float | None:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        if self._deadlines.get(key) == deadline:
+            return
+
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+
+    def remove(self, key: Hashable) -> None:
+        self._deadlines.pop(key, None)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            deadline, _, key = self._heap[0]
+
+            if self._deadlines.get(key) == deadline:
+                return
+
+            heapq.heappop(self._heap)
+
+    def next_deadline(self) -> float | None:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, window: float = 0.0) -> list:
+        due = list()
+
+        while (deadline := self.next_deadline()) is not None and deadline <= now + window:
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append((key, deadline))
+
+        return due
@@ -0,0 +1,63 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Mapping
+from loguru import logger
+from .config import Config
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    version: int
+    settings: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    published_at: float = 0.0
+
+    def get(self, key: str, default=None):
+        return self.settings.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.settings[key]
+
+
+class SettingsStore:
+    def __init__(self, settings: dict | None = None) -> None:
+        self._lock = threading.Lock()
+        self._subscribers = list()
+        self._snapshot = SettingsSnapshot(0, _freeze(settings if settings is not None else Config.DEFAULT_SETTINGS))
+
+    def get(self) -> SettingsSnapshot:
+        return self._snapshot
+
+    def publish(self, settings: dict) -> SettingsSnapshot:
+        with self._lock:
+            snapshot = SettingsSnapshot(self._snapshot.version + 1, _freeze(settings), time.monotonic())
+            self._snapshot = snapshot
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Failed to notify settings subscriber: {e}")
+
+        return snapshot
+
+    def subscribe(self, callback: Callable[[SettingsSnapshot], None]) -> None:
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SettingsSnapshot], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
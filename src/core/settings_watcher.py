@@ -0,0 +1,212 @@
+import asyncio
+import ctypes
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Callable
+from loguru import logger
+from .config import Config
+from .engine import engine
+from .metrics import settings_reloads_rejected_total, settings_reloads_total
+
+
+class SettingsWatcher:
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_IGNORED = 0x00008000
+    INOTIFY_EVENT = struct.Struct("iIII")
+    DEBOUNCE_SECONDS = 0.2
+    STAT_PERIOD_SECONDS = 5.0
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._future = None
+        self._subscribers = list()
+        self._inotify = False
+        self._known = None
+        self._known_hash = None
+        self._rejected_hash = None
+        self._signature = None
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def is_active(self) -> bool:
+        return self._inotify
+
+    def is_running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def start(self) -> None:
+        if not self.is_running():
+            self._future = engine.submit(self._run(self.path or Config.SETTINGS_FILE_PATH))
+
+    def stop(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+        self._inotify = False
+
+    async def _run(self, path: Path) -> None:
+        changed = asyncio.Event()
+        await engine.run_blocking(self._load_baseline, path)
+        close_inotify = self._open_inotify(path, changed.set)
+
+        try:
+            while True:
+                if self._inotify:
+                    await changed.wait()
+                else:
+                    # Without inotify the only option is to compare mtime and size, which is one stat call per period
+                    try:
+                        await asyncio.wait_for(changed.wait(), self.STAT_PERIOD_SECONDS)
+                    except asyncio.TimeoutError:
+                        if await engine.run_blocking(self._stat, path) == self._signature:
+                            continue
+
+                # Editors and config tools often write in several steps, so let them finish first
+                await asyncio.sleep(self.DEBOUNCE_SECONDS)
+                changed.clear()
+                await engine.run_blocking(self._reload, path)
+        finally:
+            self._inotify = False
+
+            if close_inotify is not None:
+                close_inotify()
+
+    def _open_inotify(self, path: Path, on_change: Callable[[], None]) -> Callable[[], None] | None:
+        if not sys.platform.startswith("linux"):
+            logger.info(f"Watching {path.name} for changes every {self.STAT_PERIOD_SECONDS:.0f} s")
+            return None
+
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+            # The file is replaced atomically on every save, so the directory is watched rather than the file's inode
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            if libc.inotify_add_watch(fd, os.fsencode(path.parent), self.IN_CLOSE_WRITE | self.IN_MOVED_TO) < 0:
+                error = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(error, os.strerror(error))
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify unavailable ({e}), watching {path.name} for changes every {self.STAT_PERIOD_SECONDS:.0f} s")
+            return None
+
+        loop = asyncio.get_running_loop()
+        loop.add_reader(fd, self._drain_inotify, fd, os.fsencode(path.name), on_change)
+        self._inotify = True
+        logger.info(f"Watching {path} for changes")
+
+        def close() -> None:
+            loop.remove_reader(fd)
+            os.close(fd)
+
+        return close
+
+    def _drain_inotify(self, fd: int, name: bytes, on_change: Callable[[], None]) -> None:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+
+        while offset + self.INOTIFY_EVENT.size <= len(data):
+            _, mask, _, length = self.INOTIFY_EVENT.unpack_from(data, offset)
+            event_name = data[offset + self.INOTIFY_EVENT.size:offset + self.INOTIFY_EVENT.size + length].rstrip(b"\0")
+            offset += self.INOTIFY_EVENT.size + length
+
+            if mask & self.IN_IGNORED:
+                # The directory itself went away, so only the stat fallback can notice it coming back
+                logger.error("Settings directory watch removed, falling back to periodic checks")
+                self._inotify = False
+                on_change()
+            elif event_name == name:
+                on_change()
+
+    @staticmethod
+    def _stat(path: Path) -> tuple | None:
+        try:
+            stat = path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _read(self, path: Path) -> str | None:
+        signature = self._stat(path)
+
+        try:
+            with open(path, "r") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return None
+        finally:
+            self._signature = signature
+
+        return content
+
+    def _load_baseline(self, path: Path) -> None:
+        content = self._read(path)
+        self._known = Config.DEFAULT_SETTINGS.copy()
+
+        if content is None:
+            return
+
+        try:
+            self._known = Config.validate_settings(json.loads(content))
+            self._known_hash = Config._hash(content)
+        except ValueError:
+            pass
+
+    def _reload(self, path: Path) -> None:
+        content = self._read(path)
+
+        # A deleted file leaves the running settings alone; the next save writes it again
+        if content is None:
+            return
+
+        content_hash = Config._hash(content)
+
+        if content_hash in (self._known_hash, self._rejected_hash):
+            return
+
+        try:
+            settings = Config.validate_settings(json.loads(content))
+        except ValueError as e:
+            self._rejected_hash = content_hash
+            settings_reloads_rejected_total.inc()
+            logger.error(f"Ignoring invalid settings file {path.name}: {e}")
+            return
+
+        # A save from this process already matches the running settings and only moves the baseline
+        external = Config.adopt_saved_content(content_hash)
+        changes = Config.diff_settings(self._known, settings)
+        self._known = settings
+        self._known_hash = content_hash
+
+        if not external or not changes:
+            return
+
+        settings_reloads_total.inc()
+        logger.info(f"Settings file changed: {', '.join(sorted(changes))}")
+
+        for callback in list(self._subscribers):
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error(f"Failed to notify settings watcher subscriber: {e}")
+
+
+settings_watcher = SettingsWatcher()
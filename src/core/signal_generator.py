@@ -0,0 +1,71 @@
+import threading
+import numpy as np
+from .clip import Clip
+
+
+class SignalClip(Clip):
+    def __init__(self, signal_type: str, duration: float, frequency: float, level: float, samplerate: int) -> None:
+        self.signal_type = signal_type
+        self.frequency = frequency
+        self.level = level
+        self._duration = duration
+        super().__init__(SignalGenerator.generate(signal_type, duration, frequency, level, samplerate), samplerate)
+
+    def _resample(self, samplerate: int) -> np.ndarray:
+        if samplerate == self.samplerate:
+            return self.samples
+
+        return SignalGenerator.generate(self.signal_type, self._duration, self.frequency, self.level, samplerate)
+
+
+class SignalGenerator:
+    SIGNAL_TYPES = ("tone", "noise", "carrier")
+    DEFAULT_SAMPLERATE = 48000
+    CARRIER_FREQUENCY = 15.0
+    FADE_SECONDS = 0.01
+
+    _lock = threading.Lock()
+    _clips = dict()
+
+    @staticmethod
+    def _fade(frames: int, samplerate: int) -> np.ndarray:
+        envelope = np.ones(frames, dtype=np.float32)
+        fade_frames = min(int(SignalGenerator.FADE_SECONDS * samplerate), frames // 2)
+
+        if fade_frames > 0:
+            ramp = np.sin(np.linspace(0, np.pi / 2, fade_frames, dtype=np.float32)) ** 2
+            envelope[:fade_frames] = ramp
+            envelope[-fade_frames:] = ramp[::-1]
+
+        return envelope
+
+    @staticmethod
+    def generate(signal_type: str, duration: float, frequency: float, level: float, samplerate: int) -> np.ndarray:
+        frames = max(1, int(duration * samplerate))
+
+        if signal_type == "noise":
+            samples = np.random.default_rng(0).uniform(-1.0, 1.0, frames).astype(np.float32)
+        elif signal_type in ("tone", "carrier"):
+            if signal_type == "carrier":
+                frequency = SignalGenerator.CARRIER_FREQUENCY
+
+            phase = np.arange(frames, dtype=np.float32) * np.float32(2 * np.pi * frequency / samplerate)
+            samples = np.sin(phase)
+        else:
+            raise ValueError(f"Unknown signal type: {signal_type}")
+
+        return samples * SignalGenerator._fade(frames, samplerate) * np.float32(level)
+
+    @staticmethod
+    def get_clip(signal_type: str, duration: float, frequency: float, level: float) -> SignalClip:
+        key = (signal_type, float(duration), float(frequency), float(level))
+
+        with SignalGenerator._lock:
+            clip = SignalGenerator._clips.get(key)
+
+            if clip is None:
+                clip = SignalClip(signal_type, duration, frequency, level, SignalGenerator.DEFAULT_SAMPLERATE)
+                SignalGenerator._clips.clear()
+                SignalGenerator._clips[key] = clip
+
+        return clip
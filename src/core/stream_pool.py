@@ -0,0 +1,79 @@
+import threading
+import time
+from loguru import logger
+from .backends import Backends
+
+
+class OutputStreamPool:
+    MAX_CHANNELS = 2
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._streams = dict()
+
+    @staticmethod
+    def stream_format(device, fallback_samplerate: int, fallback_channels: int) -> tuple:
+        if device is None:
+            return fallback_samplerate, min(fallback_channels, OutputStreamPool.MAX_CHANNELS)
+
+        return int(device.default_samplerate), min(device.max_output_channels, OutputStreamPool.MAX_CHANNELS)
+
+    @staticmethod
+    def _open(device, samplerate: int, channels: int):
+        return Backends.output.open_stream(device, samplerate, channels)
+
+    @staticmethod
+    def _key(device) -> int | None:
+        return None if device is None else device.index
+
+    def prewarm(self, devices: list) -> None:
+        for device in devices:
+            key = self._key(device)
+
+            with self._lock:
+                if key in self._streams:
+                    continue
+
+            try:
+                samplerate, channels = self.stream_format(device, 0, 0)
+                started = time.perf_counter()
+                stream = self._open(device, samplerate, channels)
+            except Exception as e:
+                logger.error(f"Failed to pre-warm output for {device.name}: {e}")
+                continue
+
+            with self._lock:
+                self._streams[key] = stream
+
+            logger.info(f"Pre-warmed output for {device.name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def acquire(self, device, samplerate: int, channels: int):
+        with self._lock:
+            stream = self._streams.pop(self._key(device), None)
+
+        if stream is not None and stream.active and (stream.samplerate, stream.channels) == (samplerate, channels):
+            return stream
+
+        if stream is not None:
+            self.release(stream)
+
+        return self._open(device, samplerate, channels)
+
+    @staticmethod
+    def release(stream) -> None:
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            logger.error(f"Failed to close output stream: {e}")
+
+    def close_all(self) -> None:
+        with self._lock:
+            streams = list(self._streams.values())
+            self._streams.clear()
+
+        for stream in streams:
+            self.release(stream)
+
+        if streams:
+            logger.info(f"Released {len(streams)} pre-warmed output streams")
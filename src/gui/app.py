@@ -1,17 +1,27 @@
-import queue
-from queue import Queue
 from pathlib import Path
+import copy
 import ttkbootstrap as tb
 from loguru import logger
 from ttkbootstrap.dialogs import Messagebox
 from ..core.config import Config
 from ..core.device_monitor import DeviceMonitor
+from ..core.device_registry import device_registry
+from ..core.engine import engine
+from ..core.hotplug import hotplug_watcher
+from ..core.metrics import metrics, enumeration_seconds, play_seconds, plays_total, skipped_ticks_total
+from ..core.settings_store import SettingsStore
+from ..core.settings_watcher import settings_watcher
 from .head_set_frame import HeadsetFrame
 from .settings_frame import SettingsFrame
 from .control_frame import ControlFrame
+from .tk_bridge import TkBridge
 
 
 class App(tb.Window):
+    METRICS_DIR = Path(__file__).parent.parent.parent / "resources" / "metrics"
+    METRICS_REFRESH_MS = 5000
+    DEVICE_REFRESH_MS = 60000
+
     def __init__(self) -> None:
         super().__init__(title="KeepAlive", themename="darkly")
         self.geometry("750x450")
@@ -19,16 +29,16 @@ class App(tb.Window):
 
         self._current_settings = dict()
         self._available_devices = list()
+        self._metrics_after_id = None
 
-        self._monitor_request_queue = Queue()
-        self._monitor_response_queue = Queue()
-        self._device_monitor = DeviceMonitor(self._monitor_request_queue, self._monitor_response_queue)
+        self.bridge = TkBridge(self)
+        self._settings_store = SettingsStore()
+        self._device_monitor = DeviceMonitor(self._settings_store)
 
         self._create_widgets()
         self._load_initial_data()
 
         self.protocol("WM_DELETE_WINDOW", self._on_close)
-        self.after(100, self._process_monitor_requests)
         self.after(6000, self._schedule_device_refresh)
 
         logger.info("Main window created successfully")
@@ -59,50 +69,108 @@ class App(tb.Window):
         self.control_frame = ControlFrame(container, self)
         self.control_frame.pack(fill="x", pady=(0, 10))
 
-    def _process_monitor_requests(self) -> None:
-        try:
-            message = self._monitor_request_queue.get_nowait()
+    def _publish_settings(self) -> None:
+        snapshot = self._settings_store.publish(self._current_settings)
+        logger.info(f"Settings version {snapshot.version} published")
 
-            if message == "GET_SETTINGS":
-                self._monitor_response_queue.put(self._current_settings.copy())
-                logger.info("Settings sent successfully")
+    def _refresh_metrics(self) -> None:
+        # Start and stop both refresh at once, so drop the pending refresh rather than running two loops
+        if self._metrics_after_id is not None:
+            self.after_cancel(self._metrics_after_id)
+            self._metrics_after_id = None
 
-        except queue.Empty:
-            pass
+        last_play = play_seconds.last
+        last_enumeration = enumeration_seconds.last
+        summary = [f"Plays: {plays_total.value}, skipped: {skipped_ticks_total.value}"]
 
-        except Exception as e:
-            logger.error(f"Failed to process monitor requests: {e}")
+        if last_play is not None:
+            summary.append(f"Last play: {last_play * 1000:.0f} ms")
+
+        if last_enumeration is not None:
+            summary.append(f"Last scan: {last_enumeration * 1000:.0f} ms")
+
+        self.control_frame.update_metrics("\n".join(summary))
+
+        if self._device_monitor.is_running():
+            self._metrics_after_id = self.after(self.METRICS_REFRESH_MS, self._refresh_metrics)
 
-        if self.winfo_exists():
-            self.after(100, self._process_monitor_requests)
+    def export_metrics(self) -> None:
+        if metrics.export(self.METRICS_DIR):
+            Messagebox.show_info(message=f"Metrics exported to {self.METRICS_DIR}", title="Metrics", parent=self)
+        else:
+            Messagebox.show_error(message=f"Failed to export metrics to {self.METRICS_DIR}", title="Error", parent=self)
 
     def _schedule_device_refresh(self):
-        self._refresh_available_devices()
-        self.after(60000, self._schedule_device_refresh)
+        if not hotplug_watcher.is_active():
+            self._refresh_available_devices()
+
+        self.after(self.DEVICE_REFRESH_MS, self._schedule_device_refresh)
 
     def _load_initial_data(self) -> None:
         logger.info("Displaying initial data...")
 
         self._current_settings = Config.load_settings()
+        self._publish_settings()
         self.headset_frame.update_list(self._current_settings.get("devices", Config.DEFAULT_SETTINGS["devices"]))
         self.settings_frame.update_settings(self._current_settings)
-        self._refresh_available_devices()
+        self.after_idle(self._refresh_available_devices)
+        hotplug_watcher.start()
+        settings_watcher.subscribe(self._on_settings_file_changed)
+        settings_watcher.start()
+
+    def _on_settings_file_changed(self, changes: dict) -> None:
+        self.bridge.post(self._apply_external_settings, changes)
+
+    def _apply_external_settings(self, changes: dict) -> None:
+        changes = Config.diff_settings(self._current_settings, changes)
+
+        if not changes:
+            return
+
+        self._current_settings.update(copy.deepcopy(changes))
+        self._publish_settings()
+
+        # A save queued before the edit arrived would otherwise write the old values back over it
+        if Config.has_pending_save():
+            Config.schedule_save(self._current_settings)
+
+        if "devices" in changes:
+            self.headset_frame.update_list(self._current_settings.get("devices", []))
+
+        self.settings_frame.update_settings(self._current_settings)
+        logger.info(f"External settings applied: {', '.join(sorted(changes))}")
 
     def _refresh_available_devices(self) -> None:
+        # Enumeration can take hundreds of milliseconds, so it runs on the engine and only the result comes back to Tk
+        engine.submit(self._enumerate_available_devices())
+
+    async def _enumerate_available_devices(self) -> None:
         try:
-            self._available_devices = self._device_monitor.get_output_devices()
-            self.headset_frame.update_available_devices(self._available_devices)
+            snapshot = await engine.run_blocking(device_registry.get_snapshot)
+            self.bridge.post(self._set_available_devices, snapshot.physical_names)
 
-            logger.info("Available devices refreshed successfully")
         except Exception as e:
             logger.error(f"Failed to refresh available devices: {e}")
-            self.headset_frame.update_available_devices(list())
+
+    def _set_available_devices(self, devices: list) -> None:
+        self._available_devices = devices
+        self.headset_frame.update_available_devices(devices)
+        logger.info("Available devices refreshed successfully")
 
     def _on_close(self) -> None:
         if self._device_monitor.is_running():
             self._device_monitor.stop()
 
-        Config.save_settings(self._current_settings)
+        engine.stop()
+        self.bridge.close()
+
+        # Every change was already queued for saving, so only flush it; rewriting the whole file here would
+        # undo edits made to it from outside while the window was open
+        if Config.SETTINGS_FILE_PATH.exists():
+            Config.flush_settings()
+        else:
+            Config.save_settings(self._current_settings)
+
         self.destroy()
 
         logger.info("Main window closed successfully")
@@ -113,8 +181,8 @@ class App(tb.Window):
                 self._current_settings["devices"].append(headset_name)
                 self.headset_frame.update_list(self._current_settings.get("devices", []))
 
-                Config.save_settings(self._current_settings)
-                self._refresh_available_devices()
+                self._publish_settings()
+                Config.schedule_save(self._current_settings)
                 logger.info("Headset added successfully")
 
         except Exception as e:
@@ -126,8 +194,8 @@ class App(tb.Window):
             self._current_settings["devices"].remove(headset_name)
             self.headset_frame.update_list(self._current_settings.get("devices", []))
 
-            Config.save_settings(self._current_settings)
-            self._refresh_available_devices()
+            self._publish_settings()
+            Config.schedule_save(self._current_settings)
             logger.info("Headset removed successfully")
 
         except ValueError:
@@ -140,7 +208,8 @@ class App(tb.Window):
     def request_update_settings(self, settings: dict) -> None:
         try:
             self._current_settings.update(settings)
-            Config.save_settings(self._current_settings)
+            self._publish_settings()
+            Config.schedule_save(self._current_settings)
             logger.info("Settings updated successfully")
 
         except Exception as e:
@@ -158,13 +227,14 @@ class App(tb.Window):
             logger.info("No devices to monitor")
             return
 
-        if not Path(self._current_settings.get("audio_path", "")).exists():
+        if self._current_settings.get("audio_source") != "generated" and not Path(self._current_settings.get("audio_file_path", "")).exists():
             Messagebox.show_warning(message="Please select an audio file", title="Warning", parent=self)
             logger.info("No audio file selected")
             return
 
         self._device_monitor.start()
         self.control_frame.update_status("Monitoring devices...")
+        self._refresh_metrics()
         logger.info("Device monitor started successfully")
 
     def stop_monitor(self) -> None:
@@ -175,4 +245,5 @@ class App(tb.Window):
 
         self._device_monitor.stop()
         self.control_frame.update_status("Device monitor stopped...")
+        self._refresh_metrics()
         logger.info("Device monitor stopped successfully")
@@ -16,13 +16,23 @@ class ControlFrame(tb.Frame):
         self._status_label = tb.Label(button_frame, textvariable=self._status, anchor="center", justify="center", width=30, relief="solid", padding=5)
         self._status_label.pack(side="top", pady=10)
 
+        self._metrics = tb.StringVar(value="No plays yet")
+        self._metrics_label = tb.Label(button_frame, textvariable=self._metrics, anchor="center", justify="center", width=30, bootstyle="secondary")
+        self._metrics_label.pack(side="top", pady=(0, 10))
+
         start_monitor_button = tb.Button(button_frame, text="Start", command=self.controller.start_monitor, width=30)
         start_monitor_button.pack(side="top", pady=5)
 
         stop_monitor_button = tb.Button(button_frame, text="Stop", command=self.controller.stop_monitor, width=30)
         stop_monitor_button.pack(side="top", pady=5)
 
+        export_metrics_button = tb.Button(button_frame, text="Export metrics", command=self.controller.export_metrics, width=30, bootstyle="secondary-outline")
+        export_metrics_button.pack(side="top", pady=5)
+
         logger.info("ControlFrame widgets created.")
 
     def update_status(self, status: str) -> None:
         self._status.set(status)
+
+    def update_metrics(self, summary: str) -> None:
+        self._metrics.set(summary)
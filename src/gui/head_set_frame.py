@@ -2,6 +2,8 @@ import ttkbootstrap as tb
 import tkinter as tk
 from loguru import logger
 from ttkbootstrap.dialogs import Messagebox
+from ..core.device_matcher import TargetMatcher
+from ..core.device_registry import device_registry, DeviceSnapshot, DeviceDiff
 
 class HeadsetFrame(tb.Frame):
     def __init__(self, parent: tb.Frame, controller) -> None:
@@ -9,8 +11,18 @@ class HeadsetFrame(tb.Frame):
         self.add_headset_combobox = tb.Combobox()
         self.headset_listbox = tk.Listbox
         self.controller = controller
+        self._available_devices = tuple()
         self.create_widgets()
 
+        device_registry.subscribe(self._on_devices_changed)
+
+    def destroy(self) -> None:
+        device_registry.unsubscribe(self._on_devices_changed)
+        super().destroy()
+
+    def _on_devices_changed(self, snapshot: DeviceSnapshot, diff: DeviceDiff) -> None:
+        self.controller.bridge.post(self.update_available_devices, snapshot.physical_names)
+
     def create_widgets(self) -> None:
         list_frame = tb.Frame(self)
         list_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
@@ -25,7 +37,7 @@ class HeadsetFrame(tb.Frame):
         button_frame = tb.Frame(self)
         button_frame.pack(side="right", fill="y", padx=(5, 0))
 
-        self.add_headset_combobox = tb.Combobox(button_frame, values=[], width=40, state="readonly")
+        self.add_headset_combobox = tb.Combobox(button_frame, values=[], width=40)
         self.add_headset_combobox.set("Select device to add...")
         self.add_headset_combobox.pack(fill="x", pady=2)
 
@@ -38,7 +50,13 @@ class HeadsetFrame(tb.Frame):
         logger.info("HeadsetFrame widgets created.")
 
     def _add_headset(self) -> None:
-        headset_name = self.add_headset_combobox.get().strip().lower()
+        headset_name = self.add_headset_combobox.get().strip()
+
+        # Lowercasing a regex would turn \S, \W and friends into their opposites
+        if headset_name[:len(TargetMatcher.REGEX_PREFIX)].lower() == TargetMatcher.REGEX_PREFIX:
+            headset_name = TargetMatcher.REGEX_PREFIX + headset_name[len(TargetMatcher.REGEX_PREFIX):]
+        else:
+            headset_name = headset_name.lower()
 
         if not headset_name or headset_name == "select device to add...":
             Messagebox.show_warning(message="Please select a device to add", title="Warning", parent=self)
@@ -61,13 +79,35 @@ class HeadsetFrame(tb.Frame):
         logger.info("Headset removed successfully")
 
     def update_list(self, devices: list) -> None:
-        self.headset_listbox.delete(0, tk.END)
+        current = list(self.headset_listbox.get(0, tk.END))
+
+        if current == list(devices):
+            return
 
-        for name in devices:
-            self.headset_listbox.insert(tk.END, name)
+        wanted = set(devices)
+
+        # Touch only the rows that changed, so selection and scroll position survive an update
+        for index in reversed(range(len(current))):
+            if current[index] not in wanted:
+                self.headset_listbox.delete(index)
+                del current[index]
+
+        for index, name in enumerate(devices):
+            if index >= len(current) or current[index] != name:
+                self.headset_listbox.insert(index, name)
+                current.insert(index, name)
+
+        if len(current) > len(devices):
+            self.headset_listbox.delete(len(devices), tk.END)
 
         logger.info("Headset list updated successfully")
 
     def update_available_devices(self, devices: list) -> None:
+        devices = tuple(devices)
+
+        if devices == self._available_devices:
+            return
+
+        self._available_devices = devices
         self.add_headset_combobox.config(values=devices)
         logger.info("Available devices updated successfully")
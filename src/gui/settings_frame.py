@@ -6,10 +6,17 @@ from pathlib import Path
 from ttkbootstrap.dialogs import Messagebox
 
 from src.core.config import Config
+from src.core.engine import engine
 from tkinter import filedialog
-import shutil
 
 class SettingsFrame(tb.Frame):
+    SOURCE_OPTIONS = {
+        "File": ("file", None),
+        "Tone": ("generated", "tone"),
+        "Noise": ("generated", "noise"),
+        "Carrier": ("generated", "carrier")
+    }
+
     def __init__(self, parent: tb.Frame, controller) -> None:
         super().__init__(parent, padding=10, borderwidth=1, relief="solid")
         self._controller = controller
@@ -17,6 +24,7 @@ class SettingsFrame(tb.Frame):
         self._audio_file_path = tk.StringVar()
         self._volume = tk.DoubleVar()
         self._interval = tk.IntVar()
+        self._source = tk.StringVar(value="File")
         self._volume_value_label = tb.Label()
 
         self.create_widgets()
@@ -48,6 +56,13 @@ class SettingsFrame(tb.Frame):
         self._volume_value_label = tb.Label(sound_frame, text="50%", width=4, anchor="e")
         self._volume_value_label.grid(row=1, column=2, padx=5, pady=5, sticky=tk.E)
 
+        source_label = tb.Label(sound_frame, text="Source:")
+        source_label.grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
+
+        source_combobox = tb.Combobox(sound_frame, textvariable=self._source, values=list(self.SOURCE_OPTIONS), state="readonly", width=10)
+        source_combobox.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        source_combobox.bind("<<ComboboxSelected>>", self._on_source_change)
+
         sound_frame.columnconfigure(1, weight=1)
 
         interval_frame = tb.LabelFrame(sound_interval_frame, padding=10)
@@ -71,6 +86,15 @@ class SettingsFrame(tb.Frame):
         except ValueError:
             pass
 
+    def _on_source_change(self, event=None) -> None:
+        audio_source, signal_type = self.SOURCE_OPTIONS.get(self._source.get(), ("file", None))
+        settings = {"audio_source": audio_source}
+
+        if signal_type:
+            settings["signal_type"] = signal_type
+
+        self._controller.request_update_settings(settings)
+
     def _on_settings_change(self) -> None:
         settings = {
             "interval": self._interval.get(),
@@ -81,32 +105,52 @@ class SettingsFrame(tb.Frame):
         self._controller.request_update_settings(settings)
 
     def update_settings(self, settings: dict) -> None:
-        self._audio_file_path.set(settings.get("audio_file", Config.DEFAULT_SETTINGS["audio_file_path"]))
+        self._audio_file_path.set(settings.get("audio_file_path", Config.DEFAULT_SETTINGS["audio_file_path"]))
         self._volume.set(settings.get("volume", Config.DEFAULT_SETTINGS["volume"]))
         self._interval.set(settings.get("interval", Config.DEFAULT_SETTINGS["interval"]))
         self._volume_value_label.config(text=f"{int(self._volume.get() * 100)}%")
 
+        if settings.get("audio_source", Config.DEFAULT_SETTINGS["audio_source"]) == "generated":
+            self._source.set(settings.get("signal_type", Config.DEFAULT_SETTINGS["signal_type"]).capitalize())
+        else:
+            self._source.set("File")
+
     def _browse_audio_file(self) -> None:
         try:
             initial_dir = Path(__file__).parent.parent.parent / "resources" / "audio"
 
             file_path = filedialog.askopenfilename(
                 title="Select Audio File",
-                filetypes=[("Audio Files", "*.mp3"), ("All Files", "*.")],
+                filetypes=[("Audio Files", "*.mp3 *.wav *.ogg *.flac"), ("All Files", "*.")],
                 initialdir=initial_dir
             )
 
-            if Path(file_path).exists():
-                file_name = Path(file_path).name
-                new_path = initial_dir / file_name
-
-                if Path(file_path).resolve() != new_path.resolve():
-                    shutil.copy2(file_path, new_path)
-
-                self._audio_file_path.set(str(new_path))
-                self._controller.request_update_settings({"audio_file_path": str(new_path)})
-
-                logger.info("Audio file selected successfully")
+            if file_path and Path(file_path).exists():
+                engine.submit(self._import_audio_file(file_path, initial_dir))
         except Exception as e:
             logger.error(f"Failed to select audio file: {e}")
             Messagebox.show_error(message="Failed to select audio file", title="Error", parent=self)
+
+    async def _import_audio_file(self, file_path: str, directory: Path) -> None:
+        # numpy comes with the import pipeline, so it is only loaded once the user picks a file
+        from src.core.audio_import import import_audio
+
+        try:
+            imported = await engine.run_blocking(import_audio, file_path, directory)
+            self._controller.bridge.post(self._on_audio_imported, imported)
+        except Exception as e:
+            logger.error(f"Failed to import audio file: {e}")
+            self._controller.bridge.post(self._on_audio_import_failed)
+
+    def _on_audio_imported(self, imported) -> None:
+        self._audio_file_path.set(str(imported.path))
+        self._controller.request_update_settings({
+            "audio_file_path": str(imported.path),
+            "audio_hash": imported.content_hash,
+            "audio_loudness_dbfs": imported.loudness_dbfs
+        })
+
+        logger.info(f"Audio file selected successfully ({imported.duration:.2f} s, {imported.loudness_dbfs:.1f} dBFS)")
+
+    def _on_audio_import_failed(self) -> None:
+        Messagebox.show_error(message="Failed to import audio file", title="Error", parent=self)
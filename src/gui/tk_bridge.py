@@ -0,0 +1,74 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Callable
+from loguru import logger
+
+
+class TkBridge:
+    EVENT = "<<Bridge>>"
+    RETRY_SECONDS = 0.1
+
+    def __init__(self, widget) -> None:
+        self._widget = widget
+        self._queue = queue.SimpleQueue()
+        self._wakeups = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._signalled = False
+        self._closed = threading.Event()
+        self._binding = self._widget.bind(self.EVENT, self._drain, "+")
+        self._thread = None
+
+    def post(self, callback: Callable, *args) -> None:
+        # Safe from any thread: the callback runs on the Tk thread, and the wake-up is raised from the bridge's
+        # own thread because event_generate blocks its caller until Tk gets round to it
+        self._queue.put((callback, args))
+
+        with self._lock:
+            # One pending event drains everything queued behind it, so a burst of posts wakes Tk once
+            if self._signalled or self._closed.is_set():
+                return
+
+            self._signalled = True
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tk-bridge", daemon=True)
+                self._thread.start()
+
+        self._wakeups.put(True)
+
+    def _run(self) -> None:
+        while self._wakeups.get():
+            # Before mainloop starts, or while Tk is busy tearing down, the event cannot be raised yet
+            while not self._closed.is_set():
+                try:
+                    self._widget.event_generate(self.EVENT, when="tail")
+                    break
+                except (tk.TclError, RuntimeError) as e:
+                    logger.debug(f"Failed to wake the UI thread, retrying: {e}")
+                    self._closed.wait(self.RETRY_SECONDS)
+
+    def _drain(self, event=None) -> None:
+        with self._lock:
+            self._signalled = False
+
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"Failed to run {getattr(callback, '__name__', callback)} on the UI thread: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                return
+
+            self._closed.set()
+
+        self._wakeups.put(False)
+        self._widget.unbind(self.EVENT, self._binding)
@@ -1,15 +1,220 @@
-from src.gui.app import App
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
 from loguru import logger
 
+METRICS_EXPORT_SECONDS = 60
+LOG_DIR = Path(__file__).parent.parent / "resources" / "logs"
+LOG_ROTATION = "5 MB"
+LOG_RETENTION = 3
+LOG_LEVELS = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+DEFAULT_LOG_LEVEL = "INFO"
+
+class LogRateLimiter:
+    DECISION_KEY = "rate_limit_admitted"
+
+    def __init__(self, burst: int = 5, period: float = 60.0) -> None:
+        self.burst = burst
+        self.period = period
+        self._lock = threading.Lock()
+        self._sites = dict()
+
+    def __call__(self, record: dict) -> bool:
+        # Every sink runs the filter on the same record, so the first one decides and the others reuse it
+        with self._lock:
+            decision = record["extra"].get(self.DECISION_KEY)
+
+            if decision is None:
+                decision = self._admit(record)
+                record["extra"][self.DECISION_KEY] = decision
+
+            return decision
+
+    def _admit(self, record: dict) -> bool:
+        site = (record["name"], record["function"], record["line"])
+        now = record["time"].timestamp()
+        window_start, count, suppressed, last_message = self._sites.get(site, (now, 0, 0, None))
+
+        if now - window_start >= self.period:
+            window_start, count = now, 0
+        elif record["message"] == last_message or count >= self.burst:
+            self._sites[site] = (window_start, count, suppressed + 1, last_message)
+            return False
+
+        # Duplicates are compared against what was logged, not against the suppression note added to it
+        self._sites[site] = (window_start, count + 1, 0, record["message"])
+
+        if suppressed:
+            record["message"] += f" ({suppressed} similar messages suppressed)"
+
+        return True
+
+def configure_logging(level: str, log_dir: Path) -> None:
+    rate_limiter = LogRateLimiter()
+    logger.remove()
+
+    # Sinks are enqueued so formatting and file I/O happen on loguru's writer thread, not on the UI or playback threads
+    if sys.stderr is not None:
+        logger.add(sys.stderr, level=level, filter=rate_limiter, enqueue=True)
+
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        logger.add(log_dir / "keepalive.log", level=level, filter=rate_limiter, enqueue=True, rotation=LOG_ROTATION, retention=LOG_RETENTION, encoding="utf-8")
+    except OSError as e:
+        logger.error(f"Failed to open log file in {log_dir}: {e}")
+
+def default_log_level() -> str:
+    name = os.environ.get("KEEPALIVE_LOG_LEVEL", "").strip().upper()
+
+    if not name:
+        return DEFAULT_LOG_LEVEL
+
+    try:
+        logger.level(name)
+    except ValueError:
+        logger.warning(f"Unknown KEEPALIVE_LOG_LEVEL {name!r}, using {DEFAULT_LOG_LEVEL}")
+        return DEFAULT_LOG_LEVEL
+
+    return name
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="keepalive", description="Keep wireless headsets awake by periodically playing a short sound.")
+    parser.add_argument("--headless", action="store_true", help="run the device monitor without the GUI")
+    parser.add_argument("--metrics-dir", type=Path, help="in headless mode, export Prometheus and JSON metrics to this directory every minute")
+    parser.add_argument("--in-process-audio", action="store_true", help="call PortAudio and SDL from this process instead of an isolated audio worker")
+    parser.add_argument("--log-level", type=str.upper, choices=LOG_LEVELS, default=default_log_level(), help="minimum log level (default: INFO or $KEEPALIVE_LOG_LEVEL)")
+    parser.add_argument("--log-dir", type=Path, default=LOG_DIR, help="directory for the rotated keepalive.log files")
+
+    commands = parser.add_subparsers(dest="command")
+    journal_parser = commands.add_parser("journal", help="summarize the keep-alive journal and exit")
+    journal_parser.add_argument("--days", type=float, help="only include the last DAYS days")
+    journal_parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+
+    return parser.parse_args()
+
+def run_headless(metrics_dir: Path | None) -> None:
+    from src.core.audio_player import AudioPlayer
+    from src.core.config import Config
+    from src.core.device_monitor import DeviceMonitor
+    from src.core.engine import engine
+    from src.core.metrics import metrics
+    from src.core.settings_store import SettingsStore
+    from src.core.settings_watcher import settings_watcher
+
+    stop_event = threading.Event()
+
+    def request_stop(signum, frame) -> None:
+        logger.info(f"Received signal {signal.Signals(signum).name}, stopping...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    settings = Config.load_settings()
+    settings_store = SettingsStore(settings)
+    device_monitor = DeviceMonitor(settings_store)
+    device_monitor.start()
+
+    def apply_settings_file(changes: dict) -> None:
+        settings.update(changes)
+        settings_store.publish(settings)
+
+    settings_watcher.subscribe(apply_settings_file)
+    settings_watcher.start()
+
+    # Lock waits are not interruptible by Ctrl+C on Windows, so wake up periodically there
+    wait_timeout = 1.0 if sys.platform == "win32" else None
+    next_export = time.monotonic() + METRICS_EXPORT_SECONDS
+
+    if metrics_dir is not None:
+        wait_timeout = min(wait_timeout or METRICS_EXPORT_SECONDS, METRICS_EXPORT_SECONDS)
+
+    try:
+        while not stop_event.wait(wait_timeout):
+            if metrics_dir is not None and time.monotonic() >= next_export:
+                metrics.export(metrics_dir)
+                next_export = time.monotonic() + METRICS_EXPORT_SECONDS
+    finally:
+        device_monitor.stop()
+        engine.stop()
+        AudioPlayer.quit_mixer()
+
+        if metrics_dir is not None:
+            metrics.export(metrics_dir)
+
+def run_journal_summary(days: float | None, as_json: bool) -> None:
+    import json
+    from src.core.journal import journal
+
+    since = time.time() - days * 86400 if days is not None else None
+    summary = journal.summarize(since)
+
+    if as_json:
+        print(json.dumps(summary, indent=4))
+        return
+
+    print(f"Monitor uptime: {summary['uptime_hours']:.1f} h")
+    print("Plays per device:")
+
+    for device, count in sorted(summary["plays"].items(), key=lambda item: str(item[0])):
+        failures = summary["play_failures"].get(device, 0)
+        print(f"  {device or 'default output'}: {count}" + (f" ({failures} failed)" if failures else ""))
+
+    print("Disconnects per day:")
+
+    for day, counts in summary["disconnects_per_day"].items():
+        print(f"  {day}: " + ", ".join(f"{device} {count}" for device, count in sorted(counts.items())))
+
+def _install_startup_probe(app) -> None:
+    def on_first_frame(event) -> None:
+        app.unbind("<Expose>")
+        print("KEEPALIVE_FIRST_FRAME", flush=True)
+        app.after(0, app.destroy)
+
+    app.bind("<Expose>", on_first_frame)
+
+def run_gui() -> None:
+    from src.gui.app import App
+
+    app = App()
+
+    if os.environ.get("KEEPALIVE_STARTUP_PROBE"):
+        _install_startup_probe(app)
+
+    app.mainloop()
+
 if __name__ == "__main__":
+    # Frozen Windows builds must let the audio worker process bootstrap itself here
+    multiprocessing.freeze_support()
+    args = parse_args()
+
+    if args.command == "journal":
+        run_journal_summary(args.days, args.json)
+        sys.exit(0)
+
+    configure_logging(args.log_level, args.log_dir)
+
     try:
         logger.info("Starting application...")
 
-        app = App()
-        app.mainloop()
+        if not args.in_process_audio:
+            from src.core.audio_worker import install_audio_worker
+
+            install_audio_worker()
+
+        if args.headless:
+            run_headless(args.metrics_dir)
+        else:
+            run_gui()
 
     except Exception as e:
         logger.error(f"Failed to start application: {e}")
 
     finally:
         logger.info("Application closed")
+        logger.complete()